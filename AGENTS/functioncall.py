@@ -14,7 +14,7 @@ from jprinter import jp
 class Config:
     # File Paths
     HISTORY_FOLDER: str = "History"
-    DATASET_FILE: str = "tool_usage.json"
+    DATASET_FILE: str = "tool_usage.jsonl"
     MEMORY_FILE: str = os.path.join(HISTORY_FOLDER, "memory.txt")
     CHAT_HISTORY_FILE: str = os.path.join(HISTORY_FOLDER, "chat.txt")
     CONVERSATION_HISTORY_FILE: str = os.path.join(HISTORY_FOLDER, "JARVISConversation_history.txt")
@@ -10,7 +10,7 @@ class Config:
     HISTORY_FOLDER: str = "History"
     if not os.path.exists(HISTORY_FOLDER):
         os.makedirs(HISTORY_FOLDER)
-    DATASET_FILE: str = os.path.join(HISTORY_FOLDER, "tool_usage.json")
+    DATASET_FILE: str = os.path.join(HISTORY_FOLDER, "tool_usage.jsonl")
 
     MEMORY_FILE: str = os.path.join(HISTORY_FOLDER, "memory.txt")
     CHAT_HISTORY_FILE: str = os.path.join(HISTORY_FOLDER, "chat.txt")
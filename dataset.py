@@ -5,25 +5,127 @@ import random
 import xml.etree.ElementTree as ET
 import pyarrow as pa
 import pyarrow.parquet as pq
+import pyarrow.feather as feather
+import pyarrow.compute as pc
 import re
-from typing import List, Dict, Any, Tuple, Union, Optional, Callable
+from typing import List, Dict, Any, Tuple, Union, Optional, Callable, Iterable, Iterator, Set
 from rich import print
 from rich.console import Console
 import pandas as pd
-from collections import Counter
+from collections import Counter, deque
 from datasets import Dataset, DatasetDict
 import math
 import datetime
+import threading
+import time
+import atexit
+import array
+import bisect
+import mmap
+import functools
+import collections.abc
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import contextlib
+import gzip
+import itertools
+import sqlite3
+import textwrap
+import hashlib
+import pickle
+import numpy as np
 console = Console()
 
+# Shingle hashes are polynomial hashes of code points, modulo 2**64
+SHINGLE_HASH_BASE = 1000003
+# Largest LSH bucket in which find_near_duplicates verifies every pair
+NEAR_DUPLICATE_BUCKET_PAIRS = 64
+
 def create_dataset_file(filepath: str, data: List[Dict[str, Any]]) -> None:
-    """Creates or overwrites a JSON file with the given data."""
+    """Creates or overwrites a JSON file with the given data, atomically (temp file and rename)."""
+    temp_path = filepath + '.tmp'
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with open(temp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filepath)
     except (IOError, OSError) as e:
         console.print(f"[red]Error writing to file {filepath}: {e}[/red]")
 
+def _canonical_key(value: Any) -> str:
+    """Hashable representation of a data point, including nested lists and dicts."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+def _shingle_hashes(text: str, size: int) -> np.ndarray:
+    """64-bit hashes of the distinct character shingles of a normalised text."""
+    text = ' '.join(text.lower().split())
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if not len(codes):
+        return codes
+    count = max(len(codes) - size + 1, 1)
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(min(size, len(codes))):
+        hashes = hashes * np.uint64(SHINGLE_HASH_BASE) + codes[offset:offset + count]
+    return np.unique(hashes)
+
+def _minhash_signatures(shingle_sets: List[np.ndarray], num_perm: int, seed: int) -> np.ndarray:
+    """
+    MinHash signatures (one row per set) computed in vectorised batches.
+
+    Each permutation is a multiply-shift hash (a * x + b) >> 32 with odd a,
+    evaluated with wrapping 64-bit arithmetic.
+    """
+    rng = np.random.RandomState(seed)
+    a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    signatures = np.full((len(shingle_sets), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    # Hash cache-sized batches of shingles at once, one row per permutation,
+    # and reduce each set's columns with reduceat
+    start = 0
+    while start < len(shingle_sets):
+        end, total = start, 0
+        while end < len(shingle_sets) and (total == 0 or total + len(shingle_sets[end]) <= 8192):
+            total += len(shingle_sets[end])
+            end += 1
+        batch = shingle_sets[start:end]
+        lengths = np.array([len(hashes) for hashes in batch])
+        if total:
+            hashed = np.multiply.outer(a, np.concatenate(batch))
+            hashed += b[:, None]
+            hashed >>= np.uint64(32)
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+            present = lengths > 0
+            signatures[start:end][present] = np.minimum.reduceat(hashed, offsets[present], axis=1).T
+        start = end
+    return signatures
+
+@functools.lru_cache(maxsize=None)
+def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose (bands, rows), with bands * rows <= num_perm, minimising the weighted
+    false positive and false negative probability mass around threshold (as
+    datasketch's MinHashLSH does).
+
+    A pair with Jaccard similarity s shares a bucket with probability
+    1 - (1 - s^rows)^bands; false positives integrate it below the threshold,
+    false negatives integrate its complement above. Candidates are verified
+    afterwards, so false negatives weigh 9 times more: with the defaults
+    (0.8, 128) a pair at the threshold is a candidate with probability ~0.87,
+    and at 0.84 with ~0.96.
+    """
+    options = np.array([(bands, rows) for bands in range(1, num_perm + 1)
+                        for rows in range(1, num_perm // bands + 1)], dtype=np.float64)
+    grid = np.linspace(0.0, 1.0, 1001)
+    step = grid[1] - grid[0]
+    collision = 1 - (1 - grid[None, :] ** options[:, 1:]) ** options[:, :1]
+    below, above = grid <= threshold, grid >= threshold
+    # Trapezoid rule on each side of the threshold (close enough on a fine grid)
+    false_positive = (collision * below).sum(axis=1) * step
+    false_negative = ((1 - collision) * above).sum(axis=1) * step
+    bands, rows = options[np.argmin(0.1 * false_positive + 0.9 * false_negative)]
+    return int(bands), int(rows)
+
 def load_dataset_file(filepath: str) -> Union[List[Dict[str, Any]], None]:
     """Loads a JSON dataset from a file."""
     if not os.path.exists(filepath):
@@ -35,22 +137,1387 @@ def load_dataset_file(filepath: str) -> Union[List[Dict[str, Any]], None]:
         console.print(f"[red]Error loading dataset from {filepath}: {e}[/red]")
         return None
 
+def _detect_storage(filepath: str) -> str:
+    """
+    Storage mode of a dataset path: from the extension, or for other paths from the
+    contents (a JSON array starts with '[', a JSONL log with '{').
+    """
+    storage = {
+        '.jsonl': 'jsonl', '.parquet': 'parquet', '.feather': 'feather', '.arrow': 'feather'
+    }.get(os.path.splitext(filepath)[1])
+    if storage:
+        return storage
+    if os.path.isfile(filepath):
+        with open(filepath, 'rb') as f:
+            if f.read(4096).lstrip()[:1] == b'{':
+                return 'jsonl'
+    return 'json'
+
+class LazyDataset(collections.abc.Sequence):
+    """
+    Read-mostly view of a JSONL file that decodes records on access.
+
+    The file is memory-mapped and only an offset index (a few bytes per
+    record) is kept in memory, so opening is instant and memory use does not
+    grow with the file. Supports len(), indexing, slicing (returns a list)
+    and iteration. Appended and replaced records are kept in memory on top of
+    the mapped file; deletions drop entries from the offset index.
+    """
+
+    def __init__(self, filepath: str, starts: np.ndarray, ends: np.ndarray, wrapped: np.ndarray):
+        self.filepath = filepath
+        self._starts = starts
+        self._ends = ends
+        self._wrapped = wrapped  # True where the record sits inside an update entry
+        self._overrides: Dict[int, Dict[str, Any]] = {}  # position -> replaced record
+        self._tail: List[Dict[str, Any]] = []  # records appended after opening
+        self._file = None
+        self._buffer = None
+        if len(starts):
+            self._file = open(filepath, 'rb')
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._starts) + len(self._tail)
+
+    def __repr__(self) -> str:
+        return f"LazyDataset({self.filepath!r}, {len(self)} records)"
+
+    def _decode(self, position: int) -> Dict[str, Any]:
+        """Decodes the record at a normalised position."""
+        if position >= len(self._starts):
+            return self._tail[position - len(self._starts)]
+        if position in self._overrides:
+            return self._overrides[position]
+        entry = json.loads(self._buffer[self._starts[position]:self._ends[position]])
+        return entry['record'] if self._wrapped[position] else entry
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(index, slice):
+            return [self._decode(position) for position in range(len(self))[index]]
+        return self._decode(range(len(self))[index])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for position in range(len(self)):
+            yield self._decode(position)
+
+    def __setitem__(self, index: int, record: Dict[str, Any]) -> None:
+        position = range(len(self))[index]
+        if position >= len(self._starts):
+            self._tail[position - len(self._starts)] = record
+        else:
+            self._overrides[position] = record
+
+    def __delitem__(self, index: int) -> None:
+        position = range(len(self))[index]
+        if position >= len(self._starts):
+            del self._tail[position - len(self._starts)]
+            return
+        self._starts = np.delete(self._starts, position)
+        self._ends = np.delete(self._ends, position)
+        self._wrapped = np.delete(self._wrapped, position)
+        self._overrides = {
+            (p - 1 if p > position else p): record
+            for p, record in self._overrides.items() if p != position
+        }
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Appends a record in memory (persisting it is up to the caller)."""
+        self._tail.append(record)
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        if self._buffer is not None:
+            self._buffer.close()
+            self._file.close()
+            self._buffer = self._file = None
+
+class JSONLStore:
+    """
+    Append-only JSON Lines log backing a DatasetBuilder.
+
+    Every added data point is one appended line. Updates and deletes are
+    appended as operation records ({"__op__": "update" | "delete", "id": ...})
+    that supersede earlier lines, so each write costs O(1) I/O instead of a
+    full rewrite. Record ids are the ordinal of each data line in the log.
+
+    Lines are flushed to the OS on every write and fsync'ed in batches: after
+    sync_every writes or sync_interval seconds, and on close. A process crash
+    loses nothing; a power failure loses at most the last unsynced batch.
+
+    Once superseded lines make up more than compact_ratio of the log (and at
+    least compact_min lines), a background thread rewrites the log as plain
+    records and atomically renames it into place. Writes made while it runs
+    are carried over to the new log.
+    """
+
+    OP_KEY = '__op__'
+
+    def __init__(self, filepath: str, sync_every: int = 32, sync_interval: float = 1.0,
+                 compact_ratio: float = 0.5, compact_min: int = 1000, background: bool = True):
+        self.filepath = filepath
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+        self.background = background
+        self._ids = array.array('q')  # dataset position -> record id
+        self._next_id = 0
+        self._dead = 0  # superseded lines in the log
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self._file = None
+        self._closes_at_exit = False  # close() registered with atexit while writes may be unsynced
+
+    @classmethod
+    def _replay(cls, lines: Iterable[str], records: Dict[int, Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Apply log lines to an id -> record map.
+
+        :return: (next record id, number of superseded lines)
+        """
+        next_id = dead = 0
+        for line in lines:
+            entry = json.loads(line)
+            op = entry.get(cls.OP_KEY) if isinstance(entry, dict) else None
+            if op is None:
+                records[next_id] = entry
+                next_id += 1
+            elif op == 'update':
+                records[entry['id']] = entry['record']
+                dead += 1
+            elif op == 'delete':
+                records.pop(entry['id'], None)
+                dead += 2  # the record line and the tombstone itself
+        return next_id, dead
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Stream the log and return the current data points."""
+        with self._lock:
+            records: Dict[int, Dict[str, Any]] = {}
+            self._next_id = self._dead = 0
+            if os.path.exists(self.filepath):
+                with open(self.filepath, 'r', encoding='utf-8', newline='\n') as f:
+                    if f.read(1) == '[':
+                        # Legacy pretty-printed JSON array: convert it to a log once
+                        f.seek(0)
+                        dataset = json.load(f)
+                        f.close()
+                        self.rewrite(dataset)
+                        return dataset
+                self._truncate_torn_tail()
+                with open(self.filepath, 'r', encoding='utf-8', newline='\n') as f:
+                    self._next_id, self._dead = self._replay((line for line in f if line.strip()), records)
+            self._ids = array.array('q', records)
+            return list(records.values())
+
+    def _truncate_torn_tail(self) -> None:
+        """Cuts off an incomplete last line left by a crash."""
+        with open(self.filepath, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if not end:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            cut = 0
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    cut = start + newline + 1
+                    break
+                end = start
+            console.print(f"[yellow]Warning: Discarding incomplete last line of {self.filepath}.[/yellow]")
+            f.truncate(cut)
+
+    def open_lazy(self) -> LazyDataset:
+        """
+        Index the log without decoding it and return a LazyDataset over it.
+
+        Line boundaries are found with one vectorised scan of the mapped file.
+        Only operation lines are parsed, to resolve updates and deletes.
+        """
+        with self._lock:
+            if os.path.exists(self.filepath):
+                with open(self.filepath, 'rb') as f:
+                    legacy = f.read(1) == b'['
+                if legacy:
+                    self.load()
+                else:
+                    self._truncate_torn_tail()
+
+            starts = ends = np.zeros(0, dtype=np.int64)
+            is_op = np.zeros(0, dtype=bool)
+            ops: List[Tuple[int, Dict[str, Any]]] = []
+            if os.path.exists(self.filepath) and os.path.getsize(self.filepath):
+                with open(self.filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    data = np.frombuffer(buffer, dtype=np.uint8)
+                    # Scan in blocks so the temporary mask stays small for huge files
+                    block = 1 << 24
+                    ends = np.concatenate([
+                        np.flatnonzero(data[offset:offset + block] == ord('\n')) + offset
+                        for offset in range(0, len(data), block)
+                    ])
+                    starts = np.concatenate([[0], ends[:-1] + 1])
+                    keep = ends > starts
+                    starts, ends = starts[keep], ends[keep]
+
+                    # Operation lines start with '{"__op__":'; check the cheap bytes first
+                    prefix = ('{"%s":' % self.OP_KEY).encode('utf-8')
+                    long_enough = ends - starts >= len(prefix)
+                    candidates = np.flatnonzero(long_enough)
+                    candidates = candidates[data[starts[candidates] + 2] == prefix[2]]
+                    is_op = np.zeros(len(starts), dtype=bool)
+                    for line in candidates.tolist():
+                        if buffer[starts[line]:starts[line] + len(prefix)] == prefix:
+                            is_op[line] = True
+                            ops.append((line, json.loads(buffer[starts[line]:ends[line]])))
+                    del data
+
+            # Record ids are ordinals of data lines; replay operations on their locations
+            data_lines = np.flatnonzero(~is_op)
+            record_starts, record_ends = starts[data_lines], ends[data_lines]
+            wrapped = np.zeros(len(data_lines), dtype=bool)
+            alive = np.ones(len(data_lines), dtype=bool)
+            self._dead = 0
+            for line, entry in ops:
+                if entry[self.OP_KEY] == 'update':
+                    record_starts[entry['id']], record_ends[entry['id']] = starts[line], ends[line]
+                    wrapped[entry['id']] = True
+                    self._dead += 1
+                elif entry[self.OP_KEY] == 'delete':
+                    alive[entry['id']] = False
+                    self._dead += 2
+
+            self._next_id = len(data_lines)
+            self._ids = array.array('q')
+            self._ids.frombytes(np.flatnonzero(alive).astype(np.int64).tobytes())
+            return LazyDataset(self.filepath, record_starts[alive], record_ends[alive], wrapped[alive])
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        """Append one line, sync when the batch is full and maybe start compaction."""
+        if self._file is None:
+            self._file = open(self.filepath, 'a', encoding='utf-8', newline='\n')
+        if not self._closes_at_exit:
+            atexit.register(self.close)
+            self._closes_at_exit = True
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self._sync()
+        if (self._compactor is None and self._dead >= self.compact_min
+                and self._dead > self.compact_ratio * len(self._ids)):
+            self.compact(wait=not self.background)
+
+    def _sync(self) -> None:
+        """fsync the log file."""
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _position(self, index: int) -> int:
+        """Normalise a (possibly negative) dataset index, raising IndexError when out of range."""
+        return range(len(self._ids))[index]
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append a data point."""
+        with self._lock:
+            self._ids.append(self._next_id)
+            self._next_id += 1
+            self._write(record)
+
+    def update(self, index: int, record: Dict[str, Any]) -> None:
+        """Replace the data point at a dataset index."""
+        with self._lock:
+            self._dead += 1
+            self._write({self.OP_KEY: 'update', 'id': self._ids[self._position(index)], 'record': record})
+
+    def delete(self, index: int) -> None:
+        """Delete the data point at a dataset index."""
+        with self._lock:
+            record_id = self._ids.pop(self._position(index))
+            self._dead += 2
+            self._write({self.OP_KEY: 'delete', 'id': record_id})
+
+    def rewrite(self, dataset: Iterable[Dict[str, Any]]) -> None:
+        """Replace the whole log with the given data points (any iterable), atomically."""
+        self._wait_for_compaction()
+        with self._lock:
+            self._close_file()
+            temp_path = self.filepath + '.tmp'
+            count = 0
+            with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+                for record in dataset:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    count += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.filepath)
+            self._ids = array.array('q', range(count))
+            self._next_id = count
+            self._dead = 0
+
+    def compact(self, wait: bool = True) -> None:
+        """Rewrite the log without superseded lines, in a background thread unless wait is set."""
+        self._wait_for_compaction()
+        with self._lock:
+            if not os.path.exists(self.filepath):
+                return
+            if self._file is not None:
+                self._file.flush()
+            offset = os.path.getsize(self.filepath)
+            if wait:
+                self._compact(offset)
+            else:
+                self._compactor = threading.Thread(target=self._compact, args=(offset,), daemon=True)
+                self._compactor.start()
+
+    def _compact(self, offset: int) -> None:
+        """Rewrite the log prefix up to offset, then carry over lines written meanwhile."""
+        temp_path = self.filepath + '.compact'
+        try:
+            records: Dict[int, Dict[str, Any]] = {}
+            with open(self.filepath, 'rb') as f:
+                prefix = f.read(offset).decode('utf-8')
+            next_id, _ = self._replay((line for line in prefix.split('\n') if line.strip()), records)
+            del prefix
+
+            with open(temp_path, 'w', encoding='utf-8', newline='\n') as out:
+                for record in records.values():
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                new_ids = {old_id: new_id for new_id, old_id in enumerate(records)}
+                next_new_id = len(new_ids)
+                del records
+
+                with self._lock:
+                    # Translate lines appended since the snapshot to the new ids
+                    if self._file is not None:
+                        self._file.flush()
+                    with open(self.filepath, 'rb') as f:
+                        f.seek(offset)
+                        tail = f.read().decode('utf-8')
+                    dead = 0
+                    for line in tail.split('\n'):
+                        if not line.strip():
+                            continue
+                        entry = json.loads(line)
+                        op = entry.get(self.OP_KEY) if isinstance(entry, dict) else None
+                        if op is None:
+                            new_ids[next_id] = next_new_id
+                            next_id += 1
+                            next_new_id += 1
+                        else:
+                            entry['id'] = new_ids[entry['id']]
+                            dead += 2 if op == 'delete' else 1
+                            line = json.dumps(entry, ensure_ascii=False)
+                        out.write(line + '\n')
+                    out.flush()
+                    os.fsync(out.fileno())
+                    out.close()
+
+                    self._close_file()
+                    os.replace(temp_path, self.filepath)
+                    self._ids = array.array('q', (new_ids[record_id] for record_id in self._ids))
+                    self._next_id = next_new_id
+                    self._dead = dead
+        except (IOError, OSError, ValueError, KeyError) as e:
+            console.print(f"[red]Error compacting {self.filepath}: {e}[/red]")
+            # Back off instead of retrying on every write (e.g. a mapped file on Windows)
+            self.compact_min = max(self.compact_min, 2 * self._dead)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        finally:
+            self._compactor = None
+
+    def _wait_for_compaction(self) -> None:
+        """Block until a running compaction finishes."""
+        thread = self._compactor
+        if thread is not None:
+            thread.join()
+
+    def _close_file(self) -> None:
+        """Sync and close the append handle."""
+        if self._file is not None:
+            self._file.flush()
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def flush(self) -> None:
+        """fsync all written lines now."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._sync()
+
+    def close(self) -> None:
+        """Finish compaction and sync and close the log."""
+        self._wait_for_compaction()
+        with self._lock:
+            self._close_file()
+        # Release this store; the next write registers it again
+        atexit.unregister(self.close)
+        self._closes_at_exit = False
+
+def _text_value(value: Any) -> Any:
+    """Renders a value as text for a column whose types cannot be unified."""
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+def _text_column(column: Union[pa.Array, pa.ChunkedArray]) -> pa.Array:
+    """Converts a column to strings, keeping nulls."""
+    return pa.array([_text_value(value) for value in column.to_pylist()], type=pa.string())
+
+def _concat_tables(tables: List[pa.Table]) -> pa.Table:
+    """
+    Concatenates tables, unifying schemas (missing columns become nulls).
+
+    Numeric types are widened; a column whose types still cannot be unified
+    (e.g. int64 and string) is stored as text in the result.
+    """
+    # Tables without columns can still hold rows (records with no keys)
+    tables = [table for table in tables if table.num_columns or table.num_rows]
+    if not tables:
+        return pa.table({})
+    if len(tables) == 1:
+        return tables[0]
+    try:
+        return pa.concat_tables(tables, promote_options='permissive')
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        pass
+    types: Dict[str, List[pa.DataType]] = {}
+    for table in tables:
+        for field in table.schema:
+            types.setdefault(field.name, []).append(field.type)
+    conflicting = set()
+    for name, column_types in types.items():
+        try:
+            pa.unify_schemas([pa.schema([(name, column_type)]) for column_type in column_types],
+                             promote_options='permissive')
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            conflicting.add(name)
+    tables = [
+        pa.Table.from_arrays(
+            [_text_column(table[name]) if name in conflicting else table[name] for name in table.column_names],
+            names=table.column_names
+        ) if conflicting & set(table.column_names) else table
+        for table in tables
+    ]
+    return pa.concat_tables(tables, promote_options='permissive')
+
+def _records_to_table(records: List[Dict[str, Any]]) -> pa.Table:
+    """Converts records to a table with a column for every key of any record."""
+    # Table.from_pylist takes the column names from the first record only
+    keys = list(dict.fromkeys(key for record in records for key in record))
+    if not keys:
+        # Keep the row count of records without keys
+        return pa.table([pa.nulls(len(records))], names=['_']).select([])
+    columns = []
+    for key in keys:
+        values = [record.get(key) for record in records]
+        try:
+            columns.append(pa.array(values))
+        except (pa.ArrowTypeError, pa.ArrowInvalid):
+            columns.append(pa.array([_text_value(value) for value in values], type=pa.string()))
+    return pa.table(columns, names=keys)
+
+class ArrowStore:
+    """
+    Columnar dataset directory: Parquet or Feather part files listed in a manifest.
+
+    Appending writes one new part file; rewriting writes a single part and
+    drops the old ones. Part files are renamed into place and the manifest is
+    replaced atomically, so a crash leaves either the old or the new dataset.
+    Parts are memory-mapped when read (Feather parts are stored uncompressed,
+    so reading them is zero-copy).
+    """
+
+    EXTENSIONS = {'parquet': '.parquet', 'feather': '.arrow'}
+    MANIFEST = '_manifest.json'
+    # Null column written for tables without columns; Parquet drops their rows otherwise
+    ROW_PLACEHOLDER = '__row__'
+
+    def __init__(self, filepath: str, format: str = 'parquet'):
+        if format not in self.EXTENSIONS:
+            raise ValueError(f"Unknown columnar format '{format}'. Use 'parquet' or 'feather'.")
+        self.filepath = filepath
+        self.format = format
+        os.makedirs(filepath, exist_ok=True)
+        manifest_path = os.path.join(filepath, self.MANIFEST)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        self.parts: List[str] = manifest.get('parts', [])
+        self._next_part = manifest.get('next_part', 0)
+
+    def _write_manifest(self) -> None:
+        """Atomically replaces the manifest."""
+        path = os.path.join(self.filepath, self.MANIFEST)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'format': self.format, 'parts': self.parts, 'next_part': self._next_part}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
+    def _write_part(self, table: pa.Table) -> str:
+        """Writes a table to a new part file and returns its name."""
+        name = f"part-{self._next_part:06d}{self.EXTENSIONS[self.format]}"
+        self._next_part += 1
+        path = os.path.join(self.filepath, name)
+        if not table.num_columns and table.num_rows:
+            table = pa.table([pa.nulls(table.num_rows)], names=[self.ROW_PLACEHOLDER])
+        if self.format == 'parquet':
+            pq.write_table(table, path + '.tmp')
+        else:
+            feather.write_feather(table, path + '.tmp', compression='uncompressed')
+        os.replace(path + '.tmp', path)
+        return name
+
+    def read(self) -> pa.Table:
+        """Reads all parts as one (memory-mapped) table."""
+        tables = []
+        for name in self.parts:
+            path = os.path.join(self.filepath, name)
+            if self.format == 'parquet':
+                table = pq.read_table(path, memory_map=True)
+            else:
+                table = feather.read_table(path, memory_map=True)
+            if self.ROW_PLACEHOLDER in table.column_names:
+                table = table.drop_columns([self.ROW_PLACEHOLDER])
+            tables.append(table)
+        return _concat_tables(tables)
+
+    def append_table(self, table: pa.Table) -> None:
+        """Persists new rows as an extra part."""
+        self.parts.append(self._write_part(table))
+        self._write_manifest()
+
+    def rewrite(self, table: pa.Table) -> None:
+        """Replaces the whole dataset with a single part."""
+        self.parts = [self._write_part(table)]
+        self._write_manifest()
+        for name in os.listdir(self.filepath):
+            if name.startswith('part-') and name not in self.parts:
+                try:
+                    os.remove(os.path.join(self.filepath, name))
+                except OSError:
+                    pass  # Still mapped (e.g. on Windows); removed by a later rewrite
+
+class ArrowDataset(collections.abc.Sequence):
+    """
+    Sequence view of an ArrowStore table plus a buffer of new rows.
+
+    Appended rows collect in memory and are written as one record batch per
+    batch_size rows. Point updates and deletes are applied to the table in
+    memory with zero-copy slices and persisted by the next flush(), which
+    then rewrites the store. Missing keys are stored as nulls, so records
+    read back have every column of the table. Numeric columns are widened
+    as needed; a column given values of incompatible types is stored as text.
+    """
+
+    def __init__(self, store: ArrowStore, batch_size: int = 1024, table: Optional[pa.Table] = None):
+        self.store = store
+        self.batch_size = batch_size
+        self.table = store.read() if table is None else table
+        self._buffer: List[Dict[str, Any]] = []
+        self._dirty = table is not None  # table differs from what the store holds
+        self.autoflush = True  # Write full batches as they fill up
+
+    @classmethod
+    def from_records(cls, store: ArrowStore, records: Iterable[Dict[str, Any]],
+                     batch_size: int = 1024) -> 'ArrowDataset':
+        """Builds an unsaved view holding the given records."""
+        return cls(store, batch_size, _records_to_table(list(records)))
+
+    def __len__(self) -> int:
+        return self.table.num_rows + len(self._buffer)
+
+    def __repr__(self) -> str:
+        return f"ArrowDataset({self.store.filepath!r}, {len(self)} records)"
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            rows = self.table.slice(start, max(0, min(stop, self.table.num_rows) - start)).to_pylist()
+            return rows + self._buffer[max(0, start - self.table.num_rows):max(0, stop - self.table.num_rows)]
+        position = range(len(self))[index]
+        if position >= self.table.num_rows:
+            return self._buffer[position - self.table.num_rows]
+        return self.table.slice(position, 1).to_pylist()[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for batch in self.table.to_batches(max_chunksize=self.batch_size):
+            yield from batch.to_pylist()
+        yield from list(self._buffer)
+
+    def iter_batches(self) -> Iterator[pa.RecordBatch]:
+        """Yields the data as record batches of at most batch_size rows."""
+        yield from self.to_table().to_batches(max_chunksize=self.batch_size)
+
+    def to_table(self) -> pa.Table:
+        """All rows, including buffered ones, as one table."""
+        if not self._buffer:
+            return self.table
+        return _concat_tables([self.table, _records_to_table(self._buffer)])
+
+    def _merge_buffer(self) -> None:
+        """Moves buffered rows into the in-memory table."""
+        if self._buffer:
+            self.table = self.to_table()
+            self._buffer = []
+            self._dirty = True
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Buffers a new row, flushing a full batch to the store."""
+        self._buffer.append(record)
+        if self.autoflush and len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def __setitem__(self, index: int, record: Dict[str, Any]) -> None:
+        position = range(len(self))[index]
+        self._merge_buffer()
+        self.table = _concat_tables([
+            self.table.slice(0, position),
+            _records_to_table([record]),
+            self.table.slice(position + 1)
+        ])
+        self._dirty = True
+
+    def __delitem__(self, index: int) -> None:
+        position = range(len(self))[index]
+        self._merge_buffer()
+        self.table = _concat_tables([self.table.slice(0, position), self.table.slice(position + 1)])
+        self._dirty = True
+
+    def replace(self, table: pa.Table) -> None:
+        """Replaces all rows with a table (persisted by the next flush)."""
+        self.table = table
+        self._buffer = []
+        self._dirty = True
+
+    def flush(self) -> None:
+        """Persists buffered rows, or rewrites the store after in-place changes."""
+        if not self._dirty:
+            self.flush_buffer()
+            return
+        try:
+            self.save()
+        except (pa.ArrowException, IOError, OSError) as e:
+            console.print(f"[red]Error writing to {self.store.filepath}: {e}[/red]")
+
+    def flush_buffer(self) -> None:
+        """Persists buffered rows as a new part; in-place changes wait for flush()."""
+        if not self._buffer:
+            return
+        try:
+            table = self.to_table()
+            # Write the new rows with the unified column types
+            self.store.append_table(table.slice(self.table.num_rows))
+            self.table = table
+            self._buffer = []
+        except (pa.ArrowException, IOError, OSError) as e:
+            console.print(f"[red]Error writing to {self.store.filepath}: {e}[/red]")
+
+    def save(self) -> None:
+        """Rewrites the store with the current rows."""
+        self.store.rewrite(self.to_table())
+        # Map the rewritten file instead of keeping the rows in memory
+        self.table = self.store.read()
+        self._buffer = []
+        self._dirty = False
+
+    def close(self) -> None:
+        """Flushes pending changes."""
+        self.flush()
+
+def _path_values(record: Dict[str, Any], path: str) -> List[Any]:
+    """
+    Values at a key path of a record.
+
+    Path segments are separated by dots, and a segment ending in [] steps into
+    each element of a list, e.g. 'tool_calls[].name'.
+    """
+    values = [record]
+    for segment in path.split('.'):
+        each = segment.endswith('[]')
+        name = segment[:-2] if each else segment
+        values = [value[name] for value in values if isinstance(value, dict) and name in value]
+        if each:
+            values = [element for value in values if isinstance(value, list) for element in value]
+    return values
+
+# Marks the JSON text key of an unhashable indexed value
+_UNHASHABLE = object()
+
+def _hash_key(value: Any) -> Any:
+    """Dictionary key for an indexed value (tagged JSON text for unhashable values)."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return (_UNHASHABLE, _canonical_key(value))
+
+class DatasetIndex:
+    """
+    Secondary indexes over a dataset, kept in step with single data point changes.
+
+    Hash indexes map the values at a key path to the data points holding
+    them. Text indexes map character n-grams of a field to the data points
+    containing them, so a substring query only checks data points holding
+    all of its n-grams. The key '*' indexes the text of every field.
+
+    Postings hold row ids rather than positions, so deleting a data point
+    does not shift them. Ids increase with position until the dataset is
+    reordered, which marks the indexes stale until the next rebuild.
+    """
+
+    def __init__(self, ngram: int = 3):
+        self.ngram = ngram
+        self.hash_paths: Dict[str, Dict[Any, Set[int]]] = {}
+        self.text_keys: Dict[str, Dict[str, Set[int]]] = {}
+        self.stale = False
+        self._ids: List[int] = []  # Row id of each position, ascending
+        self._next_id = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.hash_paths or self.text_keys)
+
+    def _grams(self, text: str) -> Set[str]:
+        """Lowercased character n-grams of a text."""
+        text = text.lower()
+        return {text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)}
+
+    def _texts(self, record: Dict[str, Any], key: str) -> List[str]:
+        """Text of an indexed field, or of every field for '*'."""
+        values = record.values() if key == '*' else _path_values(record, key)
+        return [str(value) for value in values]
+
+    def _keys(self, record: Dict[str, Any]) -> Iterator[Tuple[Dict[Any, Set[int]], Any]]:
+        """Yields (index, key) for every index entry of a data point."""
+        for path, postings in self.hash_paths.items():
+            for value in _path_values(record, path):
+                yield postings, _hash_key(value)
+        for key, postings in self.text_keys.items():
+            for gram in set().union(*map(self._grams, self._texts(record, key))):
+                yield postings, gram
+
+    def _index(self, row_id: int, record: Dict[str, Any]) -> None:
+        for postings, key in self._keys(record):
+            postings.setdefault(key, set()).add(row_id)
+
+    def _unindex(self, row_id: int, record: Dict[str, Any]) -> None:
+        # Drop emptied entries so value listings stay exact
+        for postings, key in self._keys(record):
+            ids = postings.get(key)
+            if ids is not None:
+                ids.discard(row_id)
+                if not ids:
+                    del postings[key]
+
+    def build(self, dataset: Iterable[Dict[str, Any]]) -> None:
+        """Rebuilds every index from the dataset."""
+        for postings in (*self.hash_paths.values(), *self.text_keys.values()):
+            postings.clear()
+        self._ids = []
+        self._next_id = 0
+        for record in dataset:
+            self.append(record)
+        self.stale = False
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Indexes a data point added at the end."""
+        row_id = self._next_id
+        self._next_id += 1
+        self._ids.append(row_id)
+        self._index(row_id, record)
+
+    def update(self, position: int, old: Dict[str, Any], new: Dict[str, Any]) -> None:
+        """Re-indexes the data point at a position."""
+        row_id = self._ids[position]
+        self._unindex(row_id, old)
+        self._index(row_id, new)
+
+    def delete(self, position: int, old: Dict[str, Any]) -> None:
+        """Unindexes a deleted data point."""
+        self._unindex(self._ids.pop(position), old)
+
+    def positions(self, ids: Iterable[int]) -> List[int]:
+        """Sorted dataset positions of row ids."""
+        return sorted(bisect.bisect_left(self._ids, row_id) for row_id in ids)
+
+    def lookup(self, path: str, value: Any) -> Set[int]:
+        """Row ids of data points with the value at an indexed path."""
+        return self.hash_paths[path].get(_hash_key(value), set())
+
+    def values(self, path: str) -> set:
+        """Distinct values at an indexed path."""
+        return {json.loads(key[1]) if isinstance(key, tuple) and key and key[0] is _UNHASHABLE else key
+                for key in self.hash_paths[path]}
+
+    def candidates(self, key: str, query: str) -> Optional[Set[int]]:
+        """
+        Row ids of data points that may contain the query in an indexed text field.
+
+        :return: Candidate row ids, or None when the query is shorter than an n-gram
+        """
+        grams = self._grams(query)
+        if not grams:
+            return None
+        postings = self.text_keys[key]
+        sets = sorted((postings.get(gram, set()) for gram in grams), key=len)
+        return sets[0].intersection(*sets[1:])
+
+# Data points per chunk written by DatasetExporter
+EXPORT_CHUNK_SIZE = 10000
+
+def _sql_value(value: Any) -> Any:
+    """Converts a value to a type SQLite can store (JSON text for containers)."""
+    if value is None or isinstance(value, (int, float, str, bytes)):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+def _cell_value(value: Any) -> Any:
+    """Converts a value to a type a spreadsheet cell can hold (text for containers)."""
+    if value is None or isinstance(value, (int, float, str, datetime.date)):
+        return value
+    return str(value)
+
+class DatasetExporter:
+    """
+    Streams data points to a file in fixed-size chunks.
+
+    Every format is written incrementally, so peak memory is one chunk
+    rather than a DataFrame or element tree of the whole dataset. Formats
+    with a header (CSV, Excel, SQLite, Parquet) take a first pass over the
+    data points to collect their columns or schema, so the data points must
+    be a sequence that can be iterated twice. Text formats are gzipped on
+    the fly when compression='gzip' or the path ends in '.gz'.
+    """
+
+    FORMATS = ('json', 'jsonl', 'csv', 'parquet', 'xml', 'excel', 'sqlite')
+
+    def __init__(self, chunk_size: int = EXPORT_CHUNK_SIZE, compression: Optional[str] = None):
+        if compression not in (None, 'gzip', 'snappy', 'zstd'):
+            raise ValueError(f"Unknown compression '{compression}'. Use 'gzip', 'snappy' or 'zstd'.")
+        self.chunk_size = chunk_size
+        self.compression = compression
+
+    def export(self, records: Iterable[Dict[str, Any]], filepath: str, format: str,
+               transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+               table_name: str = 'dataset') -> int:
+        """
+        Writes data points to a file and reports the throughput.
+
+        :param records: Data points (a list, LazyDataset or ArrowDataset)
+        :param filepath: Output file
+        :param format: One of FORMATS
+        :param transform: Optional function applied to each data point before writing
+        :param table_name: Table name for SQLite exports
+        :return: Number of data points written
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        start = time.perf_counter()
+        if format == 'parquet':
+            count = self._write_parquet(records, filepath, transform)
+        elif format == 'excel':
+            count = self._write_excel(records, filepath, transform)
+        elif format == 'sqlite':
+            count = self._write_sqlite(records, filepath, transform, table_name)
+        else:
+            with self._open_text(filepath, newline='' if format == 'csv' else None) as f:
+                count = getattr(self, f"_write_{format}")(records, f, transform)
+        elapsed = time.perf_counter() - start
+        console.print(f"[blue]Exported {count} rows to {filepath} in {elapsed:.2f}s "
+                      f"({count / max(elapsed, 1e-9):,.0f} rows/s).[/blue]")
+        return count
+
+    def _open_text(self, filepath: str, newline: Optional[str] = None):
+        """Opens a text output stream, gzipped when requested."""
+        if self.compression == 'gzip' or filepath.endswith('.gz'):
+            return gzip.open(filepath, 'wt', encoding='utf-8', newline=newline)
+        return open(filepath, 'w', encoding='utf-8', newline=newline)
+
+    def _chunks(self, records: Iterable[Dict[str, Any]],
+                transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+        """Yields lists of at most chunk_size (transformed) data points."""
+        iterator = iter(records) if transform is None else map(transform, records)
+        while True:
+            chunk = list(itertools.islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _columns(self, records: Iterable[Dict[str, Any]],
+                 transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]]) -> List[str]:
+        """Every key of any data point, in first-seen order."""
+        if isinstance(records, ArrowDataset) and transform is None:
+            return records.to_table().column_names
+        columns: Dict[str, None] = {}
+        for chunk in self._chunks(records, transform):
+            for record in chunk:
+                columns.update(dict.fromkeys(record))
+        return list(columns)
+
+    def _write_jsonl(self, records, f, transform) -> int:
+        count = 0
+        for chunk in self._chunks(records, transform):
+            f.write(''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in chunk))
+            count += len(chunk)
+        return count
+
+    def _write_json(self, records, f, transform) -> int:
+        # Same layout as json.dump(records, indent=2), one data point at a time
+        count = 0
+        f.write('[')
+        for chunk in self._chunks(records, transform):
+            f.write(''.join(
+                (',\n' if count or i else '\n') + textwrap.indent(json.dumps(item, ensure_ascii=False, indent=2), '  ')
+                for i, item in enumerate(chunk)
+            ))
+            count += len(chunk)
+        f.write('\n]' if count else ']')
+        return count
+
+    def _write_csv(self, records, f, transform) -> int:
+        writer = csv.DictWriter(f, fieldnames=self._columns(records, transform))
+        writer.writeheader()
+        count = 0
+        for chunk in self._chunks(records, transform):
+            writer.writerows(chunk)
+            count += len(chunk)
+        return count
+
+    def _write_xml(self, records, f, transform) -> int:
+        # Same output as ElementTree.write of the whole tree, one element at a time
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n<dataset>")
+        count = 0
+        for chunk in self._chunks(records, transform):
+            for item in chunk:
+                datapoint = ET.Element("datapoint")
+                for key, value in item.items():
+                    ET.SubElement(datapoint, key).text = str(value)
+                f.write(ET.tostring(datapoint, encoding='unicode'))
+            count += len(chunk)
+        f.write("</dataset>")
+        return count
+
+    def _write_parquet(self, records, filepath: str, transform) -> int:
+        codec = self.compression if self.compression in ('snappy', 'zstd', 'gzip') else 'none'
+        if isinstance(records, ArrowDataset) and transform is None:
+            table = records.to_table()
+            with pq.ParquetWriter(filepath, table.schema, compression=codec) as writer:
+                for batch in table.to_batches(max_chunksize=self.chunk_size):
+                    writer.write_batch(batch)
+            return table.num_rows
+
+        # Unify the schemas of all chunks first, so a column that is missing or
+        # null in the first chunk still gets its type
+        schema = pa.schema([])
+        for chunk in self._chunks(records, transform):
+            schema = pa.unify_schemas([schema, _records_to_table(chunk).schema], promote_options='permissive')
+        count = 0
+        with pq.ParquetWriter(filepath, schema, compression=codec) as writer:
+            for chunk in self._chunks(records, transform):
+                table = _records_to_table(chunk)
+                columns = [table.column(field.name).cast(field.type) if field.name in table.column_names
+                           else pa.nulls(len(chunk), field.type) for field in schema]
+                writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+                count += len(chunk)
+        return count
+
+    def _write_excel(self, records, filepath: str, transform) -> int:
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Sheet1')  # pandas' default sheet name
+        columns = self._columns(records, transform)
+        sheet.append(columns)
+        count = 0
+        for chunk in self._chunks(records, transform):
+            for item in chunk:
+                sheet.append([_cell_value(item.get(column)) for column in columns])
+            count += len(chunk)
+        workbook.save(filepath)
+        return count
+
+    def _write_sqlite(self, records, filepath: str, transform, table_name: str) -> int:
+        columns = self._columns(records, transform)
+        table = '"' + table_name.replace('"', '""') + '"'
+        names = ', '.join('"' + column.replace('"', '""') + '"' for column in columns)
+        count = 0
+        with contextlib.closing(sqlite3.connect(filepath)) as connection:
+            with connection:
+                connection.execute(f"DROP TABLE IF EXISTS {table}")
+                connection.execute(f"CREATE TABLE {table} ({names})")
+                insert = f"INSERT INTO {table} ({names}) VALUES ({', '.join('?' * len(columns))})"
+                for chunk in self._chunks(records, transform):
+                    connection.executemany(insert, ([_sql_value(item.get(column)) for column in columns]
+                                                    for item in chunk))
+                    count += len(chunk)
+        return count
+
+def _materialized(method: Callable) -> Callable:
+    """Decorator for methods that modify data points in place: loads a lazy or columnar view into memory first."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._materialize()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+def _map_batch(fn: Callable, batch: List[Dict[str, Any]], batched: bool) -> List[Dict[str, Any]]:
+    """
+    Applies a map function to a batch of data points (runs in map's workers).
+
+    Per data point, fn returns a dict of fields to set, or None to keep the
+    (possibly modified in place) data point. Batched, fn returns the list of
+    output data points, or None to keep the modified batch.
+    """
+    if batched:
+        results = fn(batch)
+        return batch if results is None else list(results)
+    mapped = []
+    for record in batch:
+        update = fn(record)
+        mapped.append(record if update is None else {**record, **update})
+    return mapped
+
+def _map_fingerprint(fn: Callable, batched: bool, size: int) -> str:
+    """
+    Default fingerprint of a map run: a hash of the pickled function (which
+    covers the arguments of a functools.partial), batched and the dataset size.
+    """
+    try:
+        digest = hashlib.sha256(pickle.dumps(fn)).hexdigest()[:16]
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        raise ValueError(f"Cannot fingerprint {fn!r} for a map checkpoint; pass fingerprint= "
+                         "or checkpoint=False.") from e
+    name = getattr(getattr(fn, 'func', fn), '__qualname__', type(fn).__name__)
+    return f"{name}:{digest}:{batched}:{size}"
+
+def _apply_to_column(item: Dict[str, Any], column: str, func: Callable[[Any], Any]) -> Optional[Dict[str, Any]]:
+    return {column: func(item[column])} if column in item else None
+
+def _metadata_fields(item: Dict[str, Any], metadata_fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+    return {'metadata': metadata_fn(item)}
+
+def _preprocessed_text(item: Dict[str, Any], text_key: str, lowercase: bool, remove_special_chars: bool,
+                       max_length: Optional[int]) -> Optional[Dict[str, Any]]:
+    if text_key not in item:
+        return None
+    text = item[text_key]
+    if lowercase:
+        text = text.lower()
+    if remove_special_chars:
+        text = re.sub(r'[^\w\s]', '', text)
+    if max_length:
+        words = text.split()[:max_length]
+        text = ' '.join(words)
+    return {text_key: text}
+
+def _quality_metrics(item: Dict[str, Any]) -> Dict[str, Any]:
+    metrics = {}
+
+    # Length-based metrics
+    for key, value in item.items():
+        if isinstance(value, str):
+            metrics[f'{key}_length'] = len(value.split())
+
+    # Complexity metrics
+    if 'input' in item and isinstance(item['input'], str):
+        metrics['input_complexity'] = len(set(item['input'].split())) / len(item['input'].split()) if item['input'] else 0
+
+    # Add more metrics as needed
+    return {'quality_metrics': metrics}
+
 class DatasetBuilder:
-    def __init__(self, filepath: str):
-        """Initializes a DatasetBuilder object."""
+    """
+    Builds and edits a dataset of dict data points stored in a file.
+
+    Changes are written according to the autosave policy: by default every
+    change is written immediately. Changes inside ``with builder.batch():`` are
+    coalesced into one write when the block ends.
+
+    Crash safety:
+        - Whole-dataset writes go to a temporary file that is fsynced and then
+          renamed over the dataset, so a crash leaves the old or the new
+          version, never a partial file. Columnar stores swap in new part files
+          through an atomically replaced manifest.
+        - With storage='jsonl', single data point changes outside a batch are
+          appended to the log; a crash loses at most the lines not yet synced
+          (see JSONLStore sync_every / sync_interval), and a torn last line is
+          dropped on load.
+        - Changes not yet written by the autosave policy, or made inside an
+          unfinished batch, are lost if the process crashes. They are written
+          on a normal interpreter exit when autosave_on_exit is set.
+        - A batch that raises is rolled back: the data points are reloaded from
+          storage, which the batch has not touched.
+    """
+
+    def __init__(self, filepath: str, storage: Optional[str] = None, lazy: bool = False,
+                 autosave_every: Optional[int] = 1, autosave_interval: Optional[float] = None,
+                 autosave_on_exit: bool = True, **storage_options):
+        """
+        Initializes a DatasetBuilder object.
+
+        :param filepath: Dataset file, or directory for columnar storage
+        :param storage: 'json' to rewrite a JSON array on every change, 'jsonl' for an
+                        append-only JSONLStore log, or 'parquet' / 'feather' for a columnar
+                        ArrowStore directory (inferred from the extension, or from the
+                        contents of an existing file, by default)
+        :param lazy: Open a 'jsonl' dataset as a memory-mapped LazyDataset instead of loading it;
+                     methods that modify every data point load it temporarily
+        :param autosave_every: Write after this many changes (1 writes every change; None only
+                               writes on flush, batch end, interval or exit)
+        :param autosave_interval: Also write on a change when this many seconds passed since the last write
+        :param autosave_on_exit: Write pending changes when the interpreter exits (data points
+                                 buffered by a columnar view are written at exit either way)
+        :param storage_options: Options passed to JSONLStore (e.g. sync_every or compact_ratio)
+                                or ArrowDataset (batch_size)
+        """
         self.filepath = filepath
-        self.dataset = load_dataset_file(self.filepath) or []
+        self.storage = storage or _detect_storage(filepath)
+        self.lazy = lazy
+        self.storage_options = storage_options
+        if lazy and self.storage != 'jsonl':
+            raise ValueError("Lazy loading requires storage='jsonl'.")
+        if self.storage not in ('json', 'jsonl', 'parquet', 'feather'):
+            raise ValueError(f"Unknown storage '{storage}'. Use 'json', 'jsonl', 'parquet' or 'feather'.")
+
+        self.autosave_every = autosave_every
+        self.autosave_interval = autosave_interval
+        self._pending = 0  # Changes not yet written
+        self._last_save = time.monotonic()
+        self._batch_depth = 0
+        self._unreadable: Optional[str] = None  # File that failed to load, never overwritten
+
+        self.indexes = DatasetIndex()
+        self.export_chunk_size = EXPORT_CHUNK_SIZE
+        self.store = self._open_store()
+        self.dataset = self._load()
+        self._exit_hook = self.close if autosave_on_exit else self._flush_columnar_view
+        atexit.register(self._exit_hook)
+
+    def _flush_columnar_view(self) -> None:
+        """
+        Writes what a columnar view buffered at exit when autosave_on_exit is off.
+
+        Its buffered rows and point changes are single data point changes, which
+        other storage modes write immediately, not pending changes; pending
+        whole-dataset changes stay unwritten, so only the appended rows are
+        written then.
+        """
+        if isinstance(self.dataset, ArrowDataset) and not self._batch_depth:
+            if self._pending:
+                self.dataset.flush_buffer()
+            else:
+                self.dataset.flush()
+
+    def _load(self) -> Union[List[Dict[str, Any]], LazyDataset, ArrowDataset]:
+        """Reads the data points from storage."""
+        if self.storage == 'jsonl':
+            return self.store.open_lazy() if self.lazy else self.store.load()
+        if self.storage == 'json':
+            dataset = load_dataset_file(self.filepath)
+            if dataset is None:
+                self._unreadable = self.filepath
+            return dataset or []
+        return ArrowDataset(self.store, **self.storage_options)
+
+    def _open_store(self) -> Union[JSONLStore, ArrowStore, None]:
+        """Creates the storage backend for self.filepath."""
+        if self.storage == 'jsonl':
+            return JSONLStore(self.filepath, **self.storage_options)
+        if self.storage in ('parquet', 'feather'):
+            return ArrowStore(self.filepath, self.storage)
+        return None
 
     def save_dataset(self) -> None:
         """Saves the dataset to the specified file."""
-        create_dataset_file(self.filepath, self.dataset)
+        # The dataset may have been changed as a whole, so rebuild indexes on next use
+        self.indexes.stale = True
+        self._write_dataset()
+
+    def _write_dataset(self) -> None:
+        """Writes the whole dataset to the storage backend."""
+        self._pending = 0
+        self._last_save = time.monotonic()
+        if self.store is None:
+            if self.filepath == self._unreadable:
+                console.print(f"[red]Not saving: {self.filepath} could not be loaded and would be overwritten. "
+                              f"Fix or move the file, or save to another path.[/red]")
+                return
+            create_dataset_file(self.filepath, self.dataset)
+            return
+        if self.store.filepath != self.filepath:
+            if isinstance(self.store, JSONLStore):
+                self.store.close()
+            self.store = self._open_store()
+        if isinstance(self.store, ArrowStore):
+            if not isinstance(self.dataset, ArrowDataset) or self.dataset.store is not self.store:
+                self.dataset = ArrowDataset.from_records(self.store, self.dataset, **self.storage_options)
+            try:
+                self.dataset.save()
+            except (pa.ArrowException, IOError, OSError) as e:
+                console.print(f"[red]Error writing to {self.filepath}: {e}[/red]")
+            return
+        try:
+            self.store.rewrite(self.dataset)
+        except (IOError, OSError) as e:
+            console.print(f"[red]Error writing to file {self.filepath}: {e}[/red]")
+            return
+        if self.lazy:
+            # Drop the in-memory copy and map the freshly written file instead
+            if isinstance(self.dataset, LazyDataset):
+                self.dataset.close()
+            self.dataset = self.store.open_lazy()
+
+    def _changed(self, bulk: bool = True) -> None:
+        """
+        Records a change to self.dataset and writes it if the autosave policy says so.
+
+        :param bulk: Whether the change may affect any data point (indexes are then rebuilt on next use)
+        """
+        if bulk:
+            self.indexes.stale = True
+        self._pending += 1
+        if self._batch_depth:
+            return
+        due = bool(self.autosave_every) and self._pending >= self.autosave_every
+        if self.autosave_interval is not None and time.monotonic() - self._last_save >= self.autosave_interval:
+            due = True
+        if due:
+            self._write_dataset()
+
+    def flush(self) -> None:
+        """Writes pending changes now, whatever the autosave policy."""
+        if self._pending:
+            self._write_dataset()
+        elif isinstance(self.dataset, ArrowDataset):
+            self.dataset.flush()
+        elif isinstance(self.store, JSONLStore):
+            self.store.flush()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator['DatasetBuilder']:
+        """
+        Coalesces every change made in the block into one atomic write when it ends.
+
+        Storage is not touched inside the block (changes made before it are
+        flushed first), so if the block raises, the data points are reloaded
+        from storage and its changes are discarded. Explicit save_dataset,
+        flush or close calls inside the block still write. Nested blocks join
+        the outermost one.
+        """
+        if self._batch_depth == 0:
+            self.flush()
+            self._batch_filepath = self.filepath
+        self._batch_depth += 1
+        if isinstance(self.dataset, ArrowDataset):
+            self.dataset.autoflush = False
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._rollback()
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            if isinstance(self.dataset, ArrowDataset):
+                self.dataset.autoflush = True
+            self.flush()
+
+    def _rollback(self) -> None:
+        """Discards unwritten changes by reloading the data points from storage."""
+        if isinstance(self.dataset, LazyDataset):
+            self.dataset.close()
+        self.filepath = self._batch_filepath
+        self.dataset = self._load()
+        self._pending = 0
+        self.indexes.stale = True
+        console.print("[yellow]Batch failed; unsaved changes were discarded.[/yellow]")
+
+    def _materialize(self) -> None:
+        """Loads a lazy or columnar view into memory as a list."""
+        if isinstance(self.dataset, (LazyDataset, ArrowDataset)):
+            view = self.dataset
+            self.dataset = list(view)
+            if isinstance(view, LazyDataset):
+                view.close()
+
+    def _persist(self, op: str, index: int = -1, old: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Persists a change to a single data point already applied to self.dataset,
+        and updates the secondary indexes.
+
+        The JSONL log records it as one line, and columnar views buffer and
+        persist their own changes. Other cases (and JSONL changes inside a batch
+        or after unwritten whole-dataset changes) go through the autosave policy.
+
+        :param op: 'append', 'update' or 'delete'
+        :param index: Index of the changed data point (before deletion)
+        :param old: Data point before an update or delete
+        """
+        if self.indexes and not self.indexes.stale:
+            if op == 'append':
+                self.indexes.append(self.dataset[-1])
+            elif op == 'update':
+                self.indexes.update(index, old, self.dataset[index])
+            else:
+                self.indexes.delete(index, old)
+
+        if isinstance(self.store, JSONLStore) and not (self._batch_depth or self._pending):
+            try:
+                if op == 'append':
+                    self.store.append(self.dataset[-1])
+                elif op == 'update':
+                    self.store.update(index, self.dataset[index])
+                else:
+                    self.store.delete(index)
+            except (IOError, OSError) as e:
+                console.print(f"[red]Error writing to file {self.filepath}: {e}[/red]")
+        elif not isinstance(self.dataset, ArrowDataset):
+            # The log would address data points by stale positions, so rewrite instead
+            self._changed(bulk=False)
+
+    def _append(self, data: Dict[str, Any]) -> None:
+        """Appends a data point and persists it."""
+        self.dataset.append(data)
+        self._persist('append')
+
+    def close(self) -> None:
+        """
+        Flushes pending writes and releases the storage backend.
+
+        Also drops the exit hook, so a closed builder is not kept alive until the
+        interpreter exits; changes made after closing are not written at exit.
+        """
+        self.flush()
+        if isinstance(self.store, JSONLStore):
+            self.store.close()
+        if isinstance(self.dataset, (LazyDataset, ArrowDataset)):
+            self.dataset.close()
+        elif isinstance(self.store, ArrowStore):
+            self.save_dataset()
+        atexit.unregister(self._exit_hook)
 
     def add_datapoint(self, **kwargs) -> None:
         """Adds a new data point to the dataset."""
-        self.dataset.append(kwargs)
-        self.save_dataset()
+        self._append(kwargs)
 
 
+    @_materialized
     def create_conversation_format(self, roles: List[str], content_keys: List[str]) -> None:
         """
         Creates a conversation format for chat-based LLMs.
@@ -67,7 +1534,7 @@ class DatasetBuilder:
                 for role, key in zip(roles, content_keys)
             ]
         
-        self.save_dataset()
+        self._changed()
         console.print(f"[blue]Conversation format created using roles: {roles}.[/blue]")
 
        
@@ -85,13 +1552,22 @@ class DatasetBuilder:
             console.print("[red]Invalid input. Please provide a JSON string or a dictionary.[/red]")
             return
 
-        self.dataset.append(data)
-        self.save_dataset()
+        self._append(data)
 
     def search_dataset(self, query: str, regex: bool = False, case_sensitive: bool = False) -> List[Dict[str, Any]]:
-        """Searches the dataset for data points containing the query string."""
+        """
+        Searches the dataset for data points containing the query string.
+
+        Plain-text searches only check candidates from a '*' text index when one exists.
+        """
+        records = self.dataset
+        if not regex and '*' in self.indexes.text_keys:
+            self._refresh_indexes()
+            candidates = self.indexes.candidates('*', query)
+            if candidates is not None:
+                records = (self.dataset[i] for i in self.indexes.positions(candidates))
         results = []
-        for item in self.dataset:
+        for item in records:
             if regex:
                 flags = 0 if case_sensitive else re.IGNORECASE
                 if any(re.search(query, str(value), flags) for value in item.values()):
@@ -105,110 +1581,163 @@ class DatasetBuilder:
                         results.append(item)
         return results
 
+    def create_index(self, path: str) -> None:
+        """
+        Creates a hash index on a key path, maintained as data points change.
+
+        :param path: Key, or dotted path where a segment ending in [] steps into a list,
+                     e.g. 'tool_calls[].name'
+        """
+        self.indexes.hash_paths.setdefault(path, {})
+        self.indexes.stale = True
+
+    def create_text_index(self, key: str = '*') -> None:
+        """
+        Creates an n-gram index for case-insensitive substring queries.
+
+        :param key: Key path of a text field, or '*' for the text of every field
+                    (used by search_dataset)
+        """
+        self.indexes.text_keys.setdefault(key, {})
+        self.indexes.stale = True
+
+    def drop_index(self, path: str) -> None:
+        """Removes the hash or text index on a key path."""
+        self.indexes.hash_paths.pop(path, None)
+        self.indexes.text_keys.pop(path, None)
+
+    def _refresh_indexes(self) -> None:
+        """Rebuilds the indexes if the dataset changed as a whole since they were built."""
+        if self.indexes.stale:
+            self.indexes.build(self.dataset)
+
+    def query(self, equals: Optional[Dict[str, Any]] = None, contains: Optional[Dict[str, str]] = None,
+              case_sensitive: bool = False) -> List[Dict[str, Any]]:
+        """
+        Returns the data points matching every condition, in dataset order.
+
+        Indexed conditions narrow the candidates first; the rest are checked on
+        those candidates, or on every data point when no condition is indexed.
+
+        :param equals: Key path -> value; matches when any value at the path equals it
+        :param contains: Key path (or '*' for any field) -> substring of its text
+        :param case_sensitive: Whether substring matches are case sensitive
+        :return: Matching data points
+        """
+        equals = equals or {}
+        contains = contains or {}
+        self._refresh_indexes()
+
+        candidates = None
+        unchecked = dict(equals)
+        for path, value in equals.items():
+            if path in self.indexes.hash_paths:
+                found = self.indexes.lookup(path, value)
+                candidates = found if candidates is None else candidates & found
+                del unchecked[path]
+        for key, text in contains.items():
+            if key in self.indexes.text_keys:
+                found = self.indexes.candidates(key, text)
+                if found is not None:
+                    candidates = found if candidates is None else candidates & found
+
+        if candidates is None:
+            records = iter(self.dataset)
+        else:
+            records = (self.dataset[i] for i in self.indexes.positions(candidates))
+
+        def fold(text: str) -> str:
+            return text if case_sensitive else text.lower()
+
+        def matches(record: Dict[str, Any]) -> bool:
+            if not all(any(value == expected for value in _path_values(record, path))
+                       for path, expected in unchecked.items()):
+                return False
+            for key, text in contains.items():
+                values = record.values() if key == '*' else _path_values(record, key)
+                if not any(fold(text) in fold(str(value)) for value in values):
+                    return False
+            return True
+
+        return [record for record in records if matches(record)]
+
     def delete_datapoint(self, index: int) -> None:
         """Deletes a data point from the dataset."""
         try:
+            old = self.dataset[index]
             del self.dataset[index]
-            self.save_dataset()
         except IndexError:
             console.print("[red]Invalid index.[/red]")
+            return
+        self._persist('delete', index, old)
 
     def update_datapoint(self, index: int, **kwargs) -> None:
         """Updates a data point in the dataset."""
         try:
-            self.dataset[index].update(kwargs)
-            self.save_dataset()
+            # Assign the record back so lazily loaded datasets keep the change
+            item = self.dataset[index]
+            old = dict(item)
+            item.update(kwargs)
+            self.dataset[index] = item
         except IndexError:
             console.print("[red]Invalid index.[/red]")
+            return
+        self._persist('update', index, old)
 
     def get_statistics(self) -> Dict[str, Any]:
         """Returns statistics about the dataset."""
         if not self.dataset:
             return {"total_datapoints": 0, "unique_keys": set(), "average_keys_per_datapoint": 0}
 
-        all_keys = [key for item in self.dataset for key in item.keys()]
-        key_counts = Counter(all_keys)
+        if isinstance(self.dataset, ArrowDataset):
+            # Missing keys are stored as nulls, so count the non-null values of each column
+            table = self.dataset.to_table()
+            key_counts = Counter({name: len(table) - table.column(name).null_count for name in table.column_names})
+            key_counts = +key_counts  # Drop columns without values
+        else:
+            key_counts = Counter(key for item in self.dataset for key in item.keys())
 
         return {
             "total_datapoints": len(self.dataset),
-            "unique_keys": set(all_keys),
-            "average_keys_per_datapoint": sum(len(item.keys()) for item in self.dataset) / len(self.dataset),
+            "unique_keys": set(key_counts),
+            "average_keys_per_datapoint": sum(key_counts.values()) / len(self.dataset),
             "most_common_keys": key_counts.most_common(5),
             "least_common_keys": key_counts.most_common()[:-6:-1]
         }
 
-    def export_to_csv(self, filepath: str) -> None:
-        """Exports the dataset to a CSV file."""
+    def _export(self, filepath: str, format: str, label: str, **options) -> None:
+        """Streams the dataset to a file in chunks, reporting errors to the console."""
         if not self.dataset:
             console.print("[yellow]Dataset is empty. Nothing to export.[/yellow]")
             return
         try:
-            df = pd.DataFrame(self.dataset)
-            df.to_csv(filepath, index=False, encoding='utf-8')
+            DatasetExporter(self.export_chunk_size).export(self.dataset, filepath, format, **options)
         except Exception as e:
-            console.print(f"[red]Error exporting to CSV: {e}[/red]")
+            console.print(f"[red]Error exporting to {label}: {e}[/red]")
+
+    def export_to_csv(self, filepath: str) -> None:
+        """Exports the dataset to a CSV file (gzipped if the path ends in .gz)."""
+        self._export(filepath, 'csv', 'CSV')
 
     def export_to_parquet(self, filepath: str) -> None:
-        """Exports the dataset to a Parquet file."""
-        if not self.dataset:
-            console.print("[yellow]Dataset is empty. Nothing to export.[/yellow]")
-            return
-        try:
-            df = pd.DataFrame(self.dataset)
-            df.to_parquet(filepath, index=False)
-        except Exception as e:
-            console.print(f"[red]Error exporting to Parquet: {e}[/red]")
+        """Exports the dataset to a Parquet file, one row group per chunk."""
+        self._export(filepath, 'parquet', 'Parquet')
 
     def export_to_xml(self, filepath: str) -> None:
-        """Exports the dataset to an XML file."""
-        if not self.dataset:
-            console.print("[yellow]Dataset is empty. Nothing to export.[/yellow]")
-            return
-        try:
-            root = ET.Element("dataset")
-            for item in self.dataset:
-                datapoint = ET.SubElement(root, "datapoint")
-                for key, value in item.items():
-                    ET.SubElement(datapoint, key).text = str(value)
-            tree = ET.ElementTree(root)
-            tree.write(filepath, encoding="utf-8", xml_declaration=True)
-        except Exception as e:
-            console.print(f"[red]Error exporting to XML: {e}[/red]")
+        """Exports the dataset to an XML file (gzipped if the path ends in .gz)."""
+        self._export(filepath, 'xml', 'XML')
 
     def export_to_jsonl(self, filepath: str) -> None:
-        """Exports the dataset to a JSONL file."""
-        if not self.dataset:
-            console.print("[yellow]Dataset is empty. Nothing to export.[/yellow]")
-            return
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                for item in self.dataset:
-                    json.dump(item, f, ensure_ascii=False)
-                    f.write('\n')
-        except (IOError, OSError) as e:
-            console.print(f"[red]Error exporting to JSONL: {e}[/red]")
+        """Exports the dataset to a JSONL file (gzipped if the path ends in .gz)."""
+        self._export(filepath, 'jsonl', 'JSONL')
 
     def export_to_excel(self, filepath: str) -> None:
         """Exports the dataset to an Excel file."""
-        if not self.dataset:
-            console.print("[yellow]Dataset is empty. Nothing to export.[/yellow]")
-            return
-        try:
-            df = pd.DataFrame(self.dataset)
-            df.to_excel(filepath, index=False)
-        except Exception as e:
-            console.print(f"[red]Error exporting to Excel: {e}[/red]")
+        self._export(filepath, 'excel', 'Excel')
 
     def export_to_sqlite(self, filepath: str, table_name: str) -> None:
-        """Exports the dataset to an SQLite database."""
-        if not self.dataset:
-            console.print("[yellow]Dataset is empty. Nothing to export.[/yellow]")
-            return
-        try:
-            df = pd.DataFrame(self.dataset)
-            df.to_sql(table_name, f"sqlite:///{filepath}", index=False, if_exists='replace')
-        except Exception as e:
-            console.print(f"[red]Error exporting to SQLite: {e}[/red]")
+        """Exports the dataset to an SQLite database, replacing the table."""
+        self._export(filepath, 'sqlite', 'SQLite', table_name=table_name)
 
     def modify_structure(self, old_structure: Dict[str, str], new_structure: Dict[str, str], new_filepath: Optional[str] = None) -> None:
         """
@@ -234,9 +1763,14 @@ class DatasetBuilder:
         if new_filepath:
             self.filepath = new_filepath
 
-        self.save_dataset()
-        console.print(f"[blue]Dataset structure has been modified and saved to {self.filepath}.[/blue]")
+        if self._batch_depth:
+            self._changed()
+            console.print(f"[blue]Dataset structure has been modified; it will be saved to {self.filepath} when the batch ends.[/blue]")
+        else:
+            self.save_dataset()
+            console.print(f"[blue]Dataset structure has been modified and saved to {self.filepath}.[/blue]")
 
+    @_materialized
     def clean_dataset(self, columns: List[str], remove_duplicates: bool = True, fill_missing: Optional[Any] = "") -> None:
         """
         Cleans the dataset by removing duplicates and handling missing values for specified columns.
@@ -246,7 +1780,14 @@ class DatasetBuilder:
         :param fill_missing: Value to fill in for missing data (None to skip filling)
         """
         if remove_duplicates:
-            self.dataset = [dict(t) for t in {tuple(d.items()) for d in self.dataset}]
+            seen = set()
+            unique_dataset = []
+            for item in self.dataset:
+                item_key = _canonical_key(item)
+                if item_key not in seen:
+                    seen.add(item_key)
+                    unique_dataset.append(item)
+            self.dataset = unique_dataset
 
         for item in self.dataset:
             for col in columns:
@@ -256,7 +1797,7 @@ class DatasetBuilder:
                 if fill_missing is not None and item[col] is None:
                     item[col] = fill_missing
 
-        self.save_dataset()
+        self._changed()
         console.print(f"[blue]Dataset cleaned. Processed columns: {', '.join(columns)}[/blue]")
 
     def validate_structure(self, required_structure: Dict[str, type]) -> bool:
@@ -276,6 +1817,7 @@ class DatasetBuilder:
                     return False
         return True
 
+    @_materialized
     def rename_column(self, old_name: str, new_name: str) -> None:
         """
         Renames a column in the dataset.
@@ -286,9 +1828,10 @@ class DatasetBuilder:
         for item in self.dataset:
             if old_name in item:
                 item[new_name] = item.pop(old_name)
-        self.save_dataset()
+        self._changed()
         console.print(f"[blue]Column '{old_name}' has been renamed to '{new_name}'.[/blue]")
 
+    @_materialized
     def add_column(self, name: str, default_value: Any = None) -> None:
         """
         Adds a new column to the dataset.
@@ -298,9 +1841,10 @@ class DatasetBuilder:
         """
         for item in self.dataset:
             item[name] = default_value
-        self.save_dataset()
+        self._changed()
         console.print(f"[blue]New column '{name}' has been added to the dataset.[/blue]")
 
+    @_materialized
     def remove_column(self, name: str) -> None:
         """
         Removes a column from the dataset.
@@ -309,20 +1853,21 @@ class DatasetBuilder:
         """
         for item in self.dataset:
             item.pop(name, None)
-        self.save_dataset()
+        self._changed()
         console.print(f"[blue]Column '{name}' has been removed from the dataset.[/blue]")
 
-    def apply_function_to_column(self, column: str, func: callable) -> None:
+    def apply_function_to_column(self, column: str, func: callable, num_workers: int = 1,
+                                 executor: str = 'thread') -> None:
         """
         Applies a function to all values in a specified column.
 
         :param column: The name of the column to modify
         :param func: The function to apply to each value in the column
+        :param num_workers: Number of parallel workers (see map)
+        :param executor: 'thread' or 'process' (func must then be picklable)
         """
-        for item in self.dataset:
-            if column in item:
-                item[column] = func(item[column])
-        self.save_dataset()
+        self.map(functools.partial(_apply_to_column, column=column, func=func),
+                 num_workers=num_workers, executor=executor, checkpoint=False)
         console.print(f"[blue]Function applied to column '{column}'.[/blue]")
 
     def print_dataset(self, limit: Optional[int] = None) -> None:
@@ -338,30 +1883,55 @@ class DatasetBuilder:
 
     def sort_dataset(self, key: str, reverse: bool = False) -> None:
         """Sorts the dataset based on a given key."""
+        if isinstance(self.dataset, ArrowDataset):
+            table = self.dataset.to_table()
+            if key in table.column_names:
+                # Missing values sort first, as "" does for in-memory datasets
+                column = table.column(key)
+                present = table.filter(pc.is_valid(column)).sort_by([(key, 'descending' if reverse else 'ascending')])
+                missing = table.filter(pc.is_null(column))
+                self.dataset.replace(_concat_tables([present, missing] if reverse else [missing, present]))
+                self._changed()
+                return
+        self._materialize()
         self.dataset.sort(key=lambda x: x.get(key, ""), reverse=reverse)
-        self.save_dataset()
+        self._changed()
 
     def get_unique_values(self, key: str) -> set:
-        """Returns a set of unique values for a given key in the dataset."""
+        """
+        Returns a set of unique values for a given key in the dataset.
+
+        :param key: Key, or the path of a hash index such as 'tool_calls[].name'
+        """
+        if isinstance(self.dataset, ArrowDataset):
+            table = self.dataset.to_table()
+            if key in table.column_names and not pa.types.is_nested(table.schema.field(key).type):
+                return set(pc.unique(table.column(key).drop_null()).to_pylist())
+        if key in self.indexes.hash_paths:
+            self._refresh_indexes()
+            return self.indexes.values(key)
         return set(item.get(key) for item in self.dataset if key in item)
 
+    @_materialized
     def batch_update(self, condition: callable, update: Dict[str, Any]) -> None:
         """Updates multiple datapoints that meet a certain condition."""
         for item in self.dataset:
             if condition(item):
                 item.update(update)
-        self.save_dataset()
+        self._changed()
 
+    @_materialized
     def merge_datasets(self, other_dataset: List[Dict[str, Any]]) -> None:
         """Merges another dataset into the current one."""
         self.dataset.extend(other_dataset)
         self.clean_dataset(columns=list(self.dataset[0].keys()) if self.dataset else [])  # Remove potential duplicates
-        self.save_dataset()
+        self._changed()
 
     def to_pandas(self) -> pd.DataFrame:
         """Converts the dataset to a pandas DataFrame."""
         return pd.DataFrame(self.dataset)
 
+    @_materialized
     def shuffle_dataset(self, seed: Optional[int] = None) -> None:
         """
         Shuffles the dataset randomly.
@@ -371,6 +1941,9 @@ class DatasetBuilder:
         if seed is not None:
             random.seed(seed)
         random.shuffle(self.dataset)
+        if self.store is not None:
+            # The log addresses records by position, so persist the new order
+            self._changed()
         console.print("[blue]Dataset has been shuffled.[/blue]")
 
     def extract_subset(self, n: int, shuffle: bool = True, seed: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -378,14 +1951,17 @@ class DatasetBuilder:
         Extracts a subset of the dataset.
 
         :param n: Number of rows to extract
-        :param shuffle: Whether to shuffle before extraction (default: True)
+        :param shuffle: Whether to draw a random sample instead of the first rows (default: True);
+                        the dataset itself is not reordered
         :param seed: Optional seed for reproducible extraction
         :return: Extracted subset of the dataset
         """
         if shuffle:
-            self.shuffle_dataset(seed)
-
-        subset = self.dataset[:n]
+            # Sample positions so the stored order (and the log) stays untouched
+            positions = random.Random(seed).sample(range(len(self.dataset)), min(n, len(self.dataset)))
+            subset = [self.dataset[position] for position in positions]
+        else:
+            subset = self.dataset[:n]
         console.print(f"[blue]Extracted {len(subset)} rows from the dataset.[/blue]")
         return subset
 
@@ -396,46 +1972,20 @@ class DatasetBuilder:
         :param n: Number of rows to extract
         :param filepath: Path to save the extracted subset
         :param format: Format to save the subset ('json', 'csv', 'parquet', 'xml', 'jsonl', 'excel', 'sqlite')
-        :param shuffle: Whether to shuffle before extraction (default: True)
+        :param shuffle: Whether to draw a random sample instead of the first rows (default: True)
         :param seed: Optional seed for reproducible extraction
         """
+        if format not in DatasetExporter.FORMATS:
+            console.print(f"[red]Unsupported format: {format}[/red]")
+            return
         subset = self.extract_subset(n, shuffle, seed)
         try:
-            if format == 'json':
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(subset, f, ensure_ascii=False, indent=2)
-            elif format == 'csv':
-                df = pd.DataFrame(subset)
-                df.to_csv(filepath, index=False, encoding='utf-8')
-            elif format == 'parquet':
-                df = pd.DataFrame(subset)
-                df.to_parquet(filepath, index=False)
-            elif format == 'xml':
-                root = ET.Element("dataset")
-                for item in subset:
-                    datapoint = ET.SubElement(root, "datapoint")
-                    for key, value in item.items():
-                        ET.SubElement(datapoint, key).text = str(value)
-                tree = ET.ElementTree(root)
-                tree.write(filepath, encoding="utf-8", xml_declaration=True)
-            elif format == 'jsonl':
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    for item in subset:
-                        json.dump(item, f, ensure_ascii=False)
-                        f.write('\n')
-            elif format == 'excel':
-                df = pd.DataFrame(subset)
-                df.to_excel(filepath, index=False)
-            elif format == 'sqlite':
-                df = pd.DataFrame(subset)
-                df.to_sql('subset', f"sqlite:///{filepath}", index=False, if_exists='replace')
-            else:
-                console.print(f"[red]Unsupported format: {format}[/red]")
-                return
+            DatasetExporter(self.export_chunk_size).export(subset, filepath, format, table_name='subset')
             console.print(f"[blue]Extracted subset saved to {filepath}[/blue]")
-        except (IOError, OSError) as e:
+        except (IOError, OSError, sqlite3.Error, pa.ArrowException) as e:
             console.print(f"[red]Error writing subset to file {filepath}: {e}[/red]")
 
+    @_materialized
     def from_pandas(self, df: pd.DataFrame, append: bool = False) -> None:
         """Loads data from a pandas DataFrame into the dataset."""
         new_data = df.to_dict('records')
@@ -443,7 +1993,7 @@ class DatasetBuilder:
             self.dataset.extend(new_data)
         else:
             self.dataset = new_data
-        self.save_dataset()
+        self._changed()
 
     def create_hf_dataset(self) -> DatasetDict:
         """
@@ -460,6 +2010,7 @@ class DatasetBuilder:
             'validation': test_valid['train']
         })
 
+    @_materialized
     def add_chain_of_thought(self, input_key: str, output_key: str, reasoning_key: str = "reasoning") -> None:
         """
         Adds Chain of Thought reasoning to existing data points.
@@ -471,7 +2022,7 @@ class DatasetBuilder:
         for item in self.dataset:
             if input_key in item and output_key in item:
                 item[reasoning_key] = f"Let's approach this step by step:\n1. Question: {item[input_key]}\n2. Analysis: {item[output_key]}"
-        self.save_dataset()
+        self._changed()
         console.print(f"[green]Added Chain of Thought reasoning to {len(self.dataset)} datapoints.[/green]")
 
     def validate_data(self, schema: Dict[str, type], required_keys: List[str] = None) -> List[Dict[str, Any]]:
@@ -493,6 +2044,7 @@ class DatasetBuilder:
                     invalid_entries.append((idx, item, f"Invalid type for {key}"))
         return invalid_entries
 
+    @_materialized
     def augment_data(self, augmentation_fn: Callable[[Dict[str, Any]], List[Dict[str, Any]]], 
                     max_augmentations: int = 1) -> None:
         """
@@ -507,9 +2059,171 @@ class DatasetBuilder:
             augmented_dataset.extend(augmented_versions)
         
         self.dataset.extend(augmented_dataset)
-        self.save_dataset()
+        self._changed()
         console.print(f"[green]Added {len(augmented_dataset)} augmented datapoints.[/green]")
 
+    def map(self, fn: Callable, num_workers: int = 1, batch_size: int = 1000, executor: str = 'thread',
+            batched: bool = False, checkpoint: bool = True, fingerprint: Optional[str] = None) -> None:
+        """
+        Transforms every data point in parallel, keeping their order, like datasets.Dataset.map.
+
+        Mapped batches are appended to a checkpoint file next to the dataset as they
+        complete, one line per batch. If the run is interrupted, calling map again with
+        the same function skips the batches already in the checkpoint. When every batch
+        is done the dataset is replaced in one write and the checkpoint is removed.
+        Lazy and columnar datasets are streamed, not loaded into memory first.
+        fn gets shallow copies of the data points, so modifying them in place leaves
+        the dataset unchanged until the end and a resumed run does not apply fn twice
+        (changes to nested values are not isolated this way).
+
+        :param fn: Function taking a data point and returning a dict of fields to set (or None
+                   after modifying it in place); with batched, taking a list of data points and
+                   returning the output list, which may differ in length. Must be picklable for
+                   the 'process' executor.
+        :param num_workers: Number of worker threads or processes (1 runs in this thread)
+        :param batch_size: Number of data points per batch
+        :param executor: 'thread' for I/O-bound functions, 'process' for CPU-bound ones
+        :param batched: Whether fn takes whole batches
+        :param checkpoint: Whether to checkpoint batches so an interrupted run can resume
+        :param fingerprint: Identifies the run when resuming (defaults to a hash of the pickled
+                            function, batched and the dataset size; required to checkpoint
+                            functions that cannot be pickled, such as lambdas)
+        """
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor '{executor}'. Use 'thread' or 'process'.")
+        checkpoint_path = f"{self.filepath.rstrip(os.sep)}.map.jsonl" if checkpoint else None
+        if checkpoint_path is not None and fingerprint is None:
+            fingerprint = _map_fingerprint(fn, batched, len(self.dataset))
+        done = self._open_map_checkpoint(checkpoint_path, fingerprint)
+        if done:
+            console.print(f"[blue]Resuming map after {done} data points.[/blue]")
+
+        mapped: List[Dict[str, Any]] = []
+        out = open(checkpoint_path, 'a', encoding='utf-8') if checkpoint_path else None
+        pool = None
+        if num_workers > 1:
+            pool_class = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+            pool = pool_class(max_workers=num_workers)
+        pending = deque()
+        count = 0
+        start = time.perf_counter()
+
+        def complete(size: int, results: List[Dict[str, Any]]) -> None:
+            nonlocal count
+            if out is None:
+                mapped.extend(results)
+            else:
+                out.write(json.dumps({'n': size, 'records': results}, ensure_ascii=False) + '\n')
+                out.flush()
+                os.fsync(out.fileno())
+            count += size
+
+        try:
+            source = itertools.islice(iter(self.dataset), done, None)
+            while True:
+                # Copies keep in-place changes out of the dataset until it is replaced
+                batch = [dict(record) for record in itertools.islice(source, batch_size)]
+                if not batch:
+                    break
+                if pool is None:
+                    complete(len(batch), _map_batch(fn, batch, batched))
+                    continue
+                # Keep a bounded number of batches in flight and complete them in order
+                pending.append((len(batch), pool.submit(_map_batch, fn, batch, batched)))
+                if len(pending) >= 2 * num_workers:
+                    size, future = pending.popleft()
+                    complete(size, future.result())
+            while pending:
+                size, future = pending.popleft()
+                complete(size, future.result())
+        except BaseException:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            if out is not None:
+                console.print(f"[yellow]Map stopped after {done + count} data points; "
+                              f"run it again to resume from {checkpoint_path}.[/yellow]")
+            raise
+        finally:
+            if out is not None:
+                out.close()
+            if pool is not None:
+                pool.shutdown()
+
+        self._replace_dataset(mapped if checkpoint_path is None else self._map_checkpoint_records(checkpoint_path))
+        if checkpoint_path is not None:
+            os.remove(checkpoint_path)
+        elapsed = time.perf_counter() - start
+        console.print(f"[blue]Mapped {count} data points in {elapsed:.2f}s "
+                      f"({count / max(elapsed, 1e-9):,.0f} rows/s).[/blue]")
+
+    def _open_map_checkpoint(self, path: Optional[str], fingerprint: str) -> int:
+        """
+        Prepares the map checkpoint file, dropping a torn last line.
+
+        :return: Number of data points already mapped by an interrupted run with this fingerprint
+        """
+        if path is None:
+            return 0
+        done = 0
+        if os.path.exists(path):
+            valid_size = 0
+            with open(path, 'rb') as f:
+                header = f.readline()
+                try:
+                    resumable = header.endswith(b'\n') and json.loads(header).get('fingerprint') == fingerprint
+                except ValueError:
+                    resumable = False
+                if resumable:
+                    valid_size = len(header)
+                    for line in f:
+                        if not line.endswith(b'\n'):
+                            break
+                        done += json.loads(line)['n']
+                        valid_size += len(line)
+            if resumable:
+                os.truncate(path, valid_size)
+                return done
+            console.print(f"[yellow]Discarding map checkpoint {path} from a different run.[/yellow]")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'fingerprint': fingerprint}) + '\n')
+        return done
+
+    @staticmethod
+    def _map_checkpoint_records(path: str) -> Iterator[Dict[str, Any]]:
+        """Yields the mapped data points stored in a map checkpoint."""
+        with open(path, 'r', encoding='utf-8') as f:
+            f.readline()
+            for line in f:
+                yield from json.loads(line)['records']
+
+    def _replace_dataset(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replaces every data point as a change under the autosave policy.
+
+        Outside a batch, lazily stored datasets are rewritten straight from the
+        records instead of holding them in memory. Inside a batch they are held
+        until the batch ends, since storage must not change before then.
+        """
+        if isinstance(self.store, JSONLStore) and self.lazy and not self._batch_depth:
+            self.indexes.stale = True
+            if isinstance(self.dataset, LazyDataset):
+                self.dataset.close()
+            self.store.rewrite(records)
+            self.dataset = self.store.open_lazy()
+            self._pending = 0
+            return
+        if isinstance(self.store, ArrowStore):
+            records = iter(records)
+            chunks = iter(lambda: list(itertools.islice(records, EXPORT_CHUNK_SIZE)), [])
+            table = _concat_tables([_records_to_table(chunk) for chunk in chunks])
+            self.dataset = ArrowDataset(self.store, table=table, **self.storage_options)
+            self.dataset.autoflush = not self._batch_depth
+        else:
+            if isinstance(self.dataset, LazyDataset):
+                self.dataset.close()
+            self.dataset = list(records)
+        self._changed()
+
     def batch_process(self, batch_size: int, process_fn: Callable[[List[Dict[str, Any]]], None]) -> None:
         """
         Process the dataset in batches for better performance.
@@ -534,38 +2248,139 @@ class DatasetBuilder:
 
         for item in self.dataset:
             if keys:
-                item_tuple = tuple((k, item[k]) for k in keys if k in item)
+                item_key = _canonical_key([(k, item[k]) for k in keys if k in item])
             else:
-                item_tuple = tuple(sorted(item.items()))
+                item_key = _canonical_key(item)
             
-            if item_tuple not in seen:
-                seen.add(item_tuple)
+            if item_key not in seen:
+                seen.add(item_key)
                 unique_dataset.append(item)
 
         self.dataset = unique_dataset
-        self.save_dataset()
+        self._changed()
         removed = initial_size - len(self.dataset)
         console.print(f"[green]Removed {removed} duplicate entries.[/green]")
         return removed
 
-    def add_metadata(self, metadata_fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+    def find_near_duplicates(self, keys: List[str] = None, threshold: float = 0.8, num_perm: int = 128,
+                             shingle_size: int = 5, seed: int = 1) -> List[List[int]]:
+        """
+        Finds clusters of near-duplicate data points using MinHash and LSH banding.
+
+        Each data point's text is shingled into character n-grams and reduced to a
+        MinHash signature. Points sharing a band bucket become candidate pairs, which
+        are kept when their estimated Jaccard similarity reaches the threshold, so the
+        cost grows roughly linearly with the dataset size. Buckets of up to
+        NEAR_DUPLICATE_BUCKET_PAIRS points verify every pair; in larger buckets each
+        point is only compared with the bucket's first one. Detection is probabilistic:
+        pairs well above the threshold are found almost surely, but a pair whose
+        similarity is close to the threshold can be missed.
+
+        :param keys: Keys whose values form the compared text (if None, uses all keys)
+        :param threshold: Minimum estimated Jaccard similarity of near-duplicates
+        :param num_perm: Number of MinHash permutations (signature length)
+        :param shingle_size: Number of characters per shingle
+        :param seed: Seed for the MinHash permutations
+        :return: Clusters of dataset indices, each sorted, with at least two members
+        """
+        texts = []
+        for item in self.dataset:
+            values = [item[k] for k in keys if k in item] if keys else list(item.values())
+            texts.append(' '.join(v if isinstance(v, str) else _canonical_key(v) for v in values))
+
+        shingle_sets = [_shingle_hashes(text, shingle_size) for text in texts]
+        indices = np.array([i for i, hashes in enumerate(shingle_sets) if len(hashes)], dtype=np.int64)
+        signatures = _minhash_signatures([shingle_sets[i] for i in indices], num_perm, seed)
+
+        # Union-find over verified candidate pairs
+        parent = list(range(len(indices)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        bands, rows = _lsh_params(threshold, num_perm)
+        for band in range(bands):
+            band_rows = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+            _, bucket = np.unique(band_rows.view(np.dtype((np.void, rows * 4))).ravel(), return_inverse=True)
+            bucket = bucket.ravel()
+
+            # Pair every member of a small bucket with every other member, and every
+            # member of a large bucket with its first member only
+            order = np.argsort(bucket, kind='stable')
+            sorted_buckets = bucket[order]
+            starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+            sizes = np.diff(np.r_[starts, len(order)])
+            pair_firsts, pair_members = [], []
+            for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+                bucket_members = order[start:start + size]
+                if size <= NEAR_DUPLICATE_BUCKET_PAIRS:
+                    left, right = np.triu_indices(size, 1)
+                else:
+                    left, right = np.zeros(size - 1, dtype=np.int64), np.arange(1, size)
+                pair_firsts.append(bucket_members[left])
+                pair_members.append(bucket_members[right])
+            if not pair_members:
+                continue
+            firsts, members = np.concatenate(pair_firsts), np.concatenate(pair_members)
+
+            similarity = (signatures[firsts] == signatures[members]).mean(axis=1)
+            verified = similarity >= threshold
+            for first, member in zip(firsts[verified].tolist(), members[verified].tolist()):
+                root_a, root_b = find(first), find(member)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+        clusters: Dict[int, List[int]] = {}
+        for position, index in enumerate(indices.tolist()):
+            clusters.setdefault(find(position), []).append(index)
+        return [members for members in clusters.values() if len(members) > 1]
+
+    def remove_near_duplicates(self, keys: List[str] = None, threshold: float = 0.8, num_perm: int = 128,
+                               shingle_size: int = 5, seed: int = 1) -> List[List[int]]:
+        """
+        Removes near-duplicate data points, keeping the first member of each cluster.
+
+        Takes the same parameters as find_near_duplicates.
+
+        :return: The clusters found, as indices into the dataset before removal
+        """
+        clusters = self.find_near_duplicates(keys, threshold, num_perm, shingle_size, seed)
+        duplicates = {index for members in clusters for index in members[1:]}
+        self.dataset = [item for i, item in enumerate(self.dataset) if i not in duplicates]
+        self._changed()
+        console.print(f"[green]Found {len(clusters)} near-duplicate clusters; removed {len(duplicates)} entries.[/green]")
+        return clusters
+
+    def add_metadata(self, metadata_fn: Callable[[Dict[str, Any]], Dict[str, Any]], num_workers: int = 1,
+                     executor: str = 'thread') -> None:
         """
         Adds metadata to each data point using a custom function.
         
         :param metadata_fn: Function that takes a data point and returns metadata to add
+        :param num_workers: Number of parallel workers (see map)
+        :param executor: 'thread' or 'process' (metadata_fn must then be picklable)
         """
-        for item in self.dataset:
-            metadata = metadata_fn(item)
-            item['metadata'] = metadata
-        self.save_dataset()
+        self.map(functools.partial(_metadata_fields, metadata_fn=metadata_fn),
+                 num_workers=num_workers, executor=executor, checkpoint=False)
 
-    def filter_dataset(self, condition_fn: Callable[[Dict[str, Any]], bool]) -> List[Dict[str, Any]]:
+    def filter_dataset(self, condition_fn: Union[Callable[[Dict[str, Any]], bool], pc.Expression, Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Filters the dataset based on a condition function.
         
-        :param condition_fn: Function that takes a data point and returns True/False
+        :param condition_fn: Function that takes a data point and returns True/False, a dict of
+                             key path -> required value (answered from indexes where possible, see query),
+                             or for columnar storage a pyarrow.compute expression such as pc.field("score") > 3
         :return: Filtered dataset
         """
+        if isinstance(condition_fn, dict):
+            return self.query(equals=condition_fn)
+        if isinstance(condition_fn, pc.Expression):
+            if not isinstance(self.dataset, ArrowDataset):
+                raise TypeError("Expression filters require storage='parquet' or 'feather'.")
+            return self.dataset.to_table().filter(condition_fn).to_pylist()
         filtered = [item for item in self.dataset if condition_fn(item)]
         return filtered
 
@@ -631,7 +2446,9 @@ class DatasetBuilder:
     def preprocess_text(self, text_key: str, 
                        lowercase: bool = True,
                        remove_special_chars: bool = True,
-                       max_length: Optional[int] = None) -> None:
+                       max_length: Optional[int] = None,
+                       num_workers: int = 1,
+                       executor: str = 'thread') -> None:
         """
         Preprocesses text data in the dataset.
         
@@ -639,19 +2456,12 @@ class DatasetBuilder:
         :param lowercase: Whether to convert text to lowercase
         :param remove_special_chars: Whether to remove special characters
         :param max_length: Maximum length of text (in tokens)
+        :param num_workers: Number of parallel workers (see map)
+        :param executor: 'thread' or 'process'
         """
-        for item in self.dataset:
-            if text_key in item:
-                text = item[text_key]
-                if lowercase:
-                    text = text.lower()
-                if remove_special_chars:
-                    text = re.sub(r'[^\w\s]', '', text)
-                if max_length:
-                    words = text.split()[:max_length]
-                    text = ' '.join(words)
-                item[text_key] = text
-        self.save_dataset()
+        self.map(functools.partial(_preprocessed_text, text_key=text_key, lowercase=lowercase,
+                                   remove_special_chars=remove_special_chars, max_length=max_length),
+                 num_workers=num_workers, executor=executor, checkpoint=False)
 
     def balance_dataset(self, label_key: str, strategy: str = 'undersample') -> None:
         """
@@ -660,29 +2470,41 @@ class DatasetBuilder:
         :param label_key: Key containing the class labels
         :param strategy: 'undersample' or 'oversample'
         """
-        label_counts = Counter(item[label_key] for item in self.dataset if label_key in item)
-        if not label_counts:
+        table = self.dataset.to_table() if isinstance(self.dataset, ArrowDataset) else None
+        if table is not None and label_key in table.column_names and not pa.types.is_nested(table.schema.field(label_key).type):
+            # Group row indices by label with a dictionary encoding instead of comparing dicts
+            codes = pc.dictionary_encode(table.column(label_key)).combine_chunks()
+            codes = codes.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+            groups = [np.flatnonzero(codes == code).tolist() for code in range(codes.max() + 1)] if len(codes) else []
+        else:
+            self._materialize()
+            label_indices = {}
+            for i, item in enumerate(self.dataset):
+                if label_key in item:
+                    label_indices.setdefault(item[label_key], []).append(i)
+            groups = list(label_indices.values())
+        if not groups:
             return
 
         if strategy == 'undersample':
-            min_count = min(label_counts.values())
-            balanced_dataset = []
-            for label in label_counts:
-                items = [item for item in self.dataset if item.get(label_key) == label]
-                balanced_dataset.extend(random.sample(items, min_count))
-            self.dataset = balanced_dataset
+            min_count = min(len(indices) for indices in groups)
+            groups = [random.sample(indices, min_count) for indices in groups]
         elif strategy == 'oversample':
-            max_count = max(label_counts.values())
-            balanced_dataset = []
-            for label in label_counts:
-                items = [item for item in self.dataset if item.get(label_key) == label]
-                while len(items) < max_count:
-                    items.extend(random.sample(items, min(len(items), max_count - len(items))))
-                balanced_dataset.extend(items)
-            self.dataset = balanced_dataset
-        
-        self.save_dataset()
+            max_count = max(len(indices) for indices in groups)
+            for indices in groups:
+                while len(indices) < max_count:
+                    indices.extend(random.sample(indices, min(len(indices), max_count - len(indices))))
+        else:
+            return
+        balanced = [i for indices in groups for i in indices]
 
+        if isinstance(self.dataset, ArrowDataset):
+            self.dataset.replace(table.take(balanced))
+        else:
+            self.dataset = [self.dataset[i] for i in balanced]
+        self._changed()
+
+    @_materialized
     def generate_prompt_variations(self, template_key: str, variables_key: str, num_variations: int = 3) -> None:
         """
         Generates variations of prompts using templates and variables.
@@ -712,8 +2534,9 @@ class DatasetBuilder:
                 
                 item['prompt_variations'] = variations
         
-        self.save_dataset()
+        self._changed()
 
+    @_materialized
     def add_synthetic_data(self, generator_fn: Callable[[], Dict[str, Any]], num_samples: int) -> None:
         """
         Adds synthetic data points generated by a custom function.
@@ -723,9 +2546,10 @@ class DatasetBuilder:
         """
         synthetic_data = [generator_fn() for _ in range(num_samples)]
         self.dataset.extend(synthetic_data)
-        self.save_dataset()
+        self._changed()
         console.print(f"[green]Added {num_samples} synthetic data points.[/green]")
 
+    @_materialized
     def apply_data_augmentation_pipeline(self, text_key: str, augmentation_types: List[str]) -> None:
         """
         Applies a series of text augmentation techniques.
@@ -773,7 +2597,7 @@ class DatasetBuilder:
                         augmented_dataset.append(augmented_item)
 
         self.dataset.extend(augmented_dataset)
-        self.save_dataset()
+        self._changed()
 
     def generate_few_shot_examples(self, num_shots: int = 3, shuffle: bool = True) -> List[Dict[str, Any]]:
         """
@@ -790,26 +2614,14 @@ class DatasetBuilder:
         
         return examples
 
-    def add_quality_metrics(self) -> None:
+    def add_quality_metrics(self, num_workers: int = 1, executor: str = 'thread') -> None:
         """
         Adds quality metrics to each data point.
+
+        :param num_workers: Number of parallel workers (see map)
+        :param executor: 'thread' or 'process'
         """
-        for item in self.dataset:
-            metrics = {}
-            
-            # Length-based metrics
-            for key, value in item.items():
-                if isinstance(value, str):
-                    metrics[f'{key}_length'] = len(value.split())
-            
-            # Complexity metrics
-            if 'input' in item and isinstance(item['input'], str):
-                metrics['input_complexity'] = len(set(item['input'].split())) / len(item['input'].split()) if item['input'] else 0
-            
-            # Add more metrics as needed
-            item['quality_metrics'] = metrics
-        
-        self.save_dataset()
+        self.map(_quality_metrics, num_workers=num_workers, executor=executor, checkpoint=False)
 
     def create_training_pairs(self, input_keys: List[str], output_key: str, 
                             negative_sampling: bool = False) -> List[Dict[str, Any]]:
@@ -849,35 +2661,22 @@ class DatasetBuilder:
         
         :param export_format: Format to export ('jsonl', 'csv', 'parquet')
         :param include_metadata: Whether to include metadata
-        :param compression: Whether to compress the output
+        :param compression: Whether to compress the output (gzip while writing, or snappy for Parquet)
         :return: Path to exported file
         """
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         export_path = f"training_data_{timestamp}"
         
-        if export_format == 'jsonl':
-            export_path += '.jsonl'
-            with open(export_path, 'w', encoding='utf-8') as f:
-                for item in self.dataset:
-                    if not include_metadata:
-                        item = {k: v for k, v in item.items() if not k.startswith('_')}
-                    json.dump(item, f)
-                    f.write('\n')
-        elif export_format == 'csv':
-            export_path += '.csv'
-            df = pd.DataFrame(self.dataset)
-            df.to_csv(export_path, index=False)
-        elif export_format == 'parquet':
-            export_path += '.parquet'
-            df = pd.DataFrame(self.dataset)
-            df.to_parquet(export_path, compression='snappy' if compression else None)
-        
-        if compression and export_format != 'parquet':
-            import gzip
-            with open(export_path, 'rb') as f_in:
-                with gzip.open(f"{export_path}.gz", 'wb') as f_out:
-                    f_out.writelines(f_in)
-            export_path += '.gz'
+        if export_format in ('jsonl', 'csv', 'parquet'):
+            export_path += '.' + export_format
+            if compression and export_format != 'parquet':
+                export_path += '.gz'
+            codec = ('snappy' if export_format == 'parquet' else 'gzip') if compression else None
+            transform = None if include_metadata else (
+                lambda item: {k: v for k, v in item.items() if not k.startswith('_')}
+            )
+            DatasetExporter(self.export_chunk_size, codec).export(self.dataset, export_path, export_format,
+                                                                  transform=transform)
         
         return export_path
 
@@ -1,3 +1,4 @@
+import os
 import subprocess
 from typing import List, Dict, Any
 from webscout.Provider import *
@@ -26,7 +27,11 @@ for name, obj in local_vars.items():
 
 class JARVIS:
     def __init__(self):
-        self.dataset_builder = DatasetBuilder(filepath=Config.DATASET_FILE)  # Initialize DatasetBuilder
+        # One-time move of the dataset from its old .json name; JSONLStore converts a JSON array on load
+        legacy_dataset_file = os.path.splitext(Config.DATASET_FILE)[0] + ".json"
+        if os.path.exists(legacy_dataset_file) and not os.path.exists(Config.DATASET_FILE):
+            os.replace(legacy_dataset_file, Config.DATASET_FILE)
+        self.dataset_builder = DatasetBuilder(filepath=Config.DATASET_FILE, storage="jsonl")  # Append-only log, one line per turn
         self.conversation = JARVISConversation()  # Initialize JARVISConversation
         self.agent = FunctionCallingAgent(tools=functions) #pass the list of tools to the agent class
         self.ai = C4ai(
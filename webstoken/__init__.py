@@ -4,14 +4,17 @@ Webstoken - A pure Python NLP toolkit for text processing
 
 from .tokenizer import SentenceTokenizer, WordTokenizer
 from .tagger import POSTagger
-from .stemmer import Stemmer
+from .stemmer import Stemmer, CachedStemmer
 from .normalizer import TextNormalizer
-from .processor import process_text
+from .processor import TextPipeline, process_text
+from .document import Document
 from .ner import NamedEntityRecognizer
 from .classifier import TextClassifier, TopicClassifier
 from .language import LanguageDetector
-from .sentiment import SentimentAnalyzer
+from .sentiment import SentimentAnalyzer, SentimentTracker
 from .keywords import KeywordExtractor
+from .corpus import CorpusStats
+from .vectorizer import TfidfVectorizer
 
 __version__ = '0.1.0'
 __all__ = [
@@ -19,12 +22,18 @@ __all__ = [
     'WordTokenizer',
     'POSTagger',
     'Stemmer',
+    'CachedStemmer',
     'TextNormalizer',
+    'TextPipeline',
     'process_text',
+    'Document',
     'NamedEntityRecognizer',
     'TextClassifier',
     'TopicClassifier',
     'LanguageDetector',
     'SentimentAnalyzer',
-    'KeywordExtractor'
+    'SentimentTracker',
+    'KeywordExtractor',
+    'CorpusStats',
+    'TfidfVectorizer'
 ]
@@ -0,0 +1,107 @@
+"""
+Aho-Corasick keyword automaton for single-pass multi-pattern matching.
+"""
+
+from typing import Dict, Iterator, List, Tuple
+from collections import deque
+
+
+def _is_word_char(char: str) -> bool:
+    """Match the definition of a regex word character (\\w)."""
+    return char.isalnum() or char == '_'
+
+
+class KeywordAutomaton:
+    """Case-insensitive Aho-Corasick automaton over a set of keywords."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]  # state -> [(length, value)]
+        self._built = True
+
+    def add(self, keyword: str, value: int) -> None:
+        """Add a keyword that reports value when matched."""
+        keyword = keyword.lower()
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(keyword), value))
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links breadth-first."""
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Inherit matches that end at the same position via the failure link
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield every (start, end, value) occurrence, including overlapping ones."""
+        if not self._built:
+            self.build()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for i, char in enumerate(text.lower()):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in output[state]:
+                yield i + 1 - length, i + 1, value
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Find every whole-word keyword match, including overlapping ones.
+
+        Returns:
+            List of (start, end, value) tuples ordered by start, longest first
+        """
+        text = text.lower()
+
+        def at_boundary(pos: int) -> bool:
+            before = pos > 0 and _is_word_char(text[pos - 1])
+            after = pos < len(text) and _is_word_char(text[pos])
+            return before != after
+
+        candidates = sorted(
+            (start, -end, value) for start, end, value in self.iter_matches(text)
+            if at_boundary(start) and at_boundary(end)
+        )
+        return [(start, -neg_end, value) for start, neg_end, value in candidates]
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Find whole-word keyword matches.
+
+        Matches are leftmost-longest and non-overlapping, the same as a
+        `\\b(kw1|kw2|...)\\b` regex with keywords ordered longest first.
+
+        Returns:
+            List of (start, end, value) tuples in text order
+        """
+        matches = []
+        last_end = 0
+        for start, end, value in self.find_all(text):
+            if start >= last_end:
+                matches.append((start, end, value))
+                last_end = end
+        return matches
@@ -0,0 +1,17 @@
+"""
+Benchmark and regression suite for webstoken.
+
+Run with `python -m webstoken.bench`.
+"""
+
+from .corpus import CorpusGenerator
+from .runner import BENCHMARKS, run_benchmarks, save_baseline, load_baseline, compare
+
+__all__ = [
+    'CorpusGenerator',
+    'BENCHMARKS',
+    'run_benchmarks',
+    'save_baseline',
+    'load_baseline',
+    'compare'
+]
@@ -0,0 +1,51 @@
+"""
+Command line entry point: python -m webstoken.bench
+"""
+
+import argparse
+import sys
+
+from .runner import (BENCHMARKS, run_benchmarks, save_baseline, load_baseline,
+                     compare, format_report, format_comparison)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m webstoken.bench',
+                                     description='Benchmark webstoken analyzers on synthetic corpora.')
+    parser.add_argument('benchmarks', nargs='*', help=f"Benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--scale', type=float, default=1.0, help='Corpus size multiplier')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus generator seed')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark')
+    parser.add_argument('--no-memory', action='store_true', help='Skip peak memory measurement')
+    parser.add_argument('--save', metavar='PATH', help='Write results to a JSON baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed throughput drop before failing, as a fraction')
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_benchmarks(args.benchmarks, scale=args.scale, seed=args.seed,
+                                repeats=args.repeats, measure_memory=not args.no_memory)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(format_report(report))
+
+    if args.save:
+        save_baseline(report, args.save)
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.baseline:
+        rows = compare(report, load_baseline(args.baseline), args.threshold)
+        print()
+        print(format_comparison(rows))
+        regressions = [row for row in rows if row['regressed']]
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
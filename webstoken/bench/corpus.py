@@ -0,0 +1,109 @@
+"""
+Deterministic synthetic corpora for benchmarking.
+"""
+
+from typing import Dict, List
+import random
+
+
+# Vocabulary mixing function words, topic keywords, sentiment words and
+# modifiers so every analyzer has something to find
+FUNCTION_WORDS = [
+    'the', 'a', 'an', 'and', 'or', 'but', 'of', 'to', 'in', 'on', 'at', 'for',
+    'with', 'from', 'by', 'is', 'was', 'are', 'were', 'it', 'this', 'that',
+    'they', 'we', 'you', 'he', 'she', 'not', 'no', 'very', 'really', 'slightly'
+]
+
+CONTENT_WORDS = [
+    'computer', 'software', 'internet', 'programming', 'data', 'algorithm',
+    'research', 'experiment', 'physics', 'biology', 'theory', 'analysis',
+    'company', 'market', 'finance', 'investment', 'startup', 'revenue',
+    'government', 'policy', 'election', 'parliament', 'campaign', 'minister',
+    'game', 'team', 'player', 'tournament', 'coach', 'victory',
+    'movie', 'music', 'concert', 'actor', 'festival', 'theater',
+    'good', 'great', 'excellent', 'happy', 'wonderful', 'amazing', 'love',
+    'bad', 'terrible', 'awful', 'sad', 'poor', 'hate', 'annoying',
+    'angry', 'worried', 'surprised', 'cheerful', 'nervous', 'shocked',
+    'running', 'jumped', 'development', 'happiness', 'quickly', 'beautiful',
+    'system', 'model', 'network', 'language', 'question', 'answer', 'weather',
+    'city', 'river', 'street', 'morning', 'evening', 'project', 'meeting'
+]
+
+CAPITALIZED = ['John', 'Maria', 'Acme', 'Globex', 'Paris', 'London', 'Smith', 'Corp', 'Inc']
+
+ENTITY_TEMPLATES = [
+    'Dr {name} Smith', 'Acme Corp', '{name}@example.com', 'https://example.com/{name}',
+    '12/05/2023', 'Jan 5, 2024', '10:30 PM', '$1,250.00', '45%', 'Main street'
+]
+
+CATEGORIES = {
+    'technology': ['computer', 'software', 'internet', 'programming', 'algorithm', 'network'],
+    'business': ['company', 'market', 'finance', 'investment', 'startup', 'revenue'],
+    'sports': ['game', 'team', 'player', 'tournament', 'coach', 'victory'],
+    'entertainment': ['movie', 'music', 'concert', 'actor', 'festival', 'theater']
+}
+
+
+class CorpusGenerator:
+    """Seeded generator of chat turns, articles and book-length text."""
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.vocabulary = FUNCTION_WORDS + CONTENT_WORDS
+        # Zipf-like weights: earlier words are much more frequent
+        self.weights = [1.0 / (rank + 1) for rank in range(len(self.vocabulary))]
+
+    def _rng(self, name: str) -> random.Random:
+        """Independent, reproducible random stream per corpus."""
+        return random.Random(f"{self.seed}:{name}")
+
+    def sentence(self, rng: random.Random, min_words: int = 5, max_words: int = 20) -> str:
+        """Generate one sentence."""
+        words = rng.choices(self.vocabulary, self.weights, k=rng.randint(min_words, max_words))
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words)), rng.choice(CAPITALIZED))
+        if rng.random() < 0.15:
+            words.append(rng.choice(ENTITY_TEMPLATES).format(name=rng.choice(CAPITALIZED).lower()))
+        words[0] = words[0].capitalize()
+        return ' '.join(words) + rng.choice(['.', '.', '.', '!', '?'])
+
+    def paragraph(self, rng: random.Random, num_sentences: int) -> str:
+        """Generate a paragraph of num_sentences sentences."""
+        return ' '.join(self.sentence(rng) for _ in range(num_sentences))
+
+    def chat(self, num_turns: int = 500) -> List[str]:
+        """Short chat turns of one or two sentences."""
+        rng = self._rng('chat')
+        return [self.paragraph(rng, rng.randint(1, 2)) for _ in range(num_turns)]
+
+    def articles(self, num_articles: int = 20, paragraphs: int = 8) -> List[str]:
+        """Medium-length articles."""
+        rng = self._rng('articles')
+        return [
+            '\n\n'.join(self.paragraph(rng, rng.randint(3, 7)) for _ in range(paragraphs))
+            for _ in range(num_articles)
+        ]
+
+    def book(self, num_paragraphs: int = 600) -> List[str]:
+        """A single book-length text."""
+        rng = self._rng('book')
+        return ['\n\n'.join(self.paragraph(rng, rng.randint(4, 10)) for _ in range(num_paragraphs))]
+
+    def labeled(self, docs_per_category: int = 50) -> Dict[str, List[str]]:
+        """Training documents for TextClassifier, biased towards each category's words."""
+        rng = self._rng('labeled')
+        documents = {}
+        for category, keywords in CATEGORIES.items():
+            documents[category] = [
+                self.sentence(rng) + ' ' + ' '.join(rng.choices(keywords, k=5))
+                for _ in range(docs_per_category)
+            ]
+        return documents
+
+    def corpora(self, scale: float = 1.0) -> Dict[str, List[str]]:
+        """The standard chat / article / book corpora, sized by scale."""
+        return {
+            'chat': self.chat(max(1, int(500 * scale))),
+            'article': self.articles(max(1, int(20 * scale))),
+            'book': self.book(max(1, int(600 * scale)))
+        }
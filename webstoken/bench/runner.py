@@ -0,0 +1,191 @@
+"""
+Benchmark runner with baseline comparison.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import json
+import math
+import platform
+import time
+import tracemalloc
+import warnings
+
+from ..tokenizer import WordTokenizer
+from ..processor import process_text
+from ..keywords import KeywordExtractor
+from ..classifier import TextClassifier
+from ..language import LanguageDetector
+from ..sentiment import SentimentAnalyzer
+from ..ner import NamedEntityRecognizer
+from .corpus import CorpusGenerator
+
+
+def _classifier(generator: CorpusGenerator) -> Callable[[str], Any]:
+    """TextClassifier trained on the generator's labeled documents."""
+    classifier = TextClassifier()
+    classifier.train(generator.labeled())
+    return classifier.classify
+
+
+# Benchmark name -> factory returning the per-text callable. Factories run
+# before timing starts, so construction and training are not measured.
+BENCHMARKS: Dict[str, Callable[[CorpusGenerator], Callable[[str], Any]]] = {
+    'process_text': lambda generator: process_text,
+    'extract_keywords': lambda generator: KeywordExtractor().extract_keywords,
+    'extract_keyphrases': lambda generator: KeywordExtractor().extract_keyphrases,
+    'classify': _classifier,
+    'detect': lambda generator: LanguageDetector().detect,
+    'analyze_sentiment': lambda generator: SentimentAnalyzer().analyze_sentiment,
+    'extract_entities': lambda generator: NamedEntityRecognizer().extract_entities,
+}
+
+
+def count_tokens(texts: Iterable[str]) -> int:
+    """Number of word tokens in a corpus."""
+    tokenizer = WordTokenizer()
+    return sum(len(tokenizer.tokenize(text)) for text in texts)
+
+
+def _time(fn: Callable[[str], Any], texts: List[str], repeats: int) -> float:
+    """Best wall-clock time of running fn over all texts."""
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _peak_memory(fn: Callable[[str], Any], texts: List[str]) -> int:
+    """Peak bytes allocated while running fn over all texts."""
+    tracemalloc.start()
+    try:
+        for text in texts:
+            fn(text)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(names: Optional[List[str]] = None, scale: float = 1.0, seed: int = 0,
+                   repeats: int = 3, measure_memory: bool = True) -> Dict[str, Any]:
+    """
+    Time analyzers over the synthetic chat, article and book corpora.
+
+    Each analyzer is warmed up once per corpus, then timed repeats times and
+    the best run is kept. Peak memory is measured in a separate traced run,
+    since tracemalloc slows execution down.
+
+    Args:
+        names: Benchmarks to run (defaults to all of BENCHMARKS)
+        scale: Corpus size multiplier
+        seed: Corpus generator seed
+        repeats: Number of timed runs per benchmark
+        measure_memory: Whether to record peak memory
+
+    Returns:
+        Report dict with run settings and a results entry per
+        "benchmark/corpus" pair
+    """
+    names = names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark '{unknown[0]}'. Available benchmarks: {', '.join(BENCHMARKS)}")
+
+    generator = CorpusGenerator(seed)
+    corpora = generator.corpora(scale)
+    token_counts = {name: count_tokens(texts) for name, texts in corpora.items()}
+
+    results = {}
+    for name in names:
+        fn = BENCHMARKS[name](generator)
+        for corpus_name, texts in corpora.items():
+            fn(texts[0])
+            seconds = _time(fn, texts, repeats)
+            tokens = token_counts[corpus_name]
+            result = {
+                'texts': len(texts),
+                'tokens': tokens,
+                'seconds': seconds,
+                'tokens_per_sec': tokens / seconds if seconds else float('inf')
+            }
+            if measure_memory:
+                result['peak_memory_kb'] = _peak_memory(fn, texts) / 1024
+            results[f"{name}/{corpus_name}"] = result
+
+    return {
+        'settings': {'scale': scale, 'seed': seed, 'repeats': repeats},
+        'python': platform.python_version(),
+        'results': results
+    }
+
+
+def save_baseline(report: Dict[str, Any], path: str) -> None:
+    """Write a benchmark report to a JSON baseline file."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """Read a JSON baseline file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Compare a report against a baseline.
+
+    A benchmark regresses when its throughput drops by more than threshold
+    (a fraction, 0.2 = 20%) relative to the baseline. Benchmarks missing from
+    the baseline, or whose baseline throughput is zero or infinite, are
+    skipped. Differing run settings are reported with a warning.
+
+    Returns:
+        One row per compared benchmark with baseline and current throughput,
+        relative change and a regressed flag
+    """
+    if baseline.get('settings') != report.get('settings'):
+        warnings.warn(f"Baseline settings {baseline.get('settings')} differ from "
+                      f"current settings {report.get('settings')}")
+
+    rows = []
+    for key, result in report['results'].items():
+        previous = baseline['results'].get(key)
+        if previous is None or not 0 < previous['tokens_per_sec'] < math.inf:
+            continue
+        change = result['tokens_per_sec'] / previous['tokens_per_sec'] - 1
+        rows.append({
+            'benchmark': key,
+            'baseline': previous['tokens_per_sec'],
+            'current': result['tokens_per_sec'],
+            'change': change,
+            'regressed': change < -threshold
+        })
+    return rows
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Format a benchmark report as a text table."""
+    lines = [f"{'benchmark':<32}{'texts':>8}{'tokens':>10}{'seconds':>10}{'tok/s':>12}{'peak KB':>10}"]
+    for key, result in report['results'].items():
+        peak = result.get('peak_memory_kb')
+        lines.append(
+            f"{key:<32}{result['texts']:>8}{result['tokens']:>10}{result['seconds']:>10.3f}"
+            f"{result['tokens_per_sec']:>12.0f}{'-' if peak is None else f'{peak:.0f}':>10}"
+        )
+    return '\n'.join(lines)
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Format comparison rows as a text table."""
+    lines = [f"{'benchmark':<32}{'baseline':>12}{'current':>12}{'change':>9}"]
+    for row in rows:
+        flag = '  REGRESSION' if row['regressed'] else ''
+        lines.append(
+            f"{row['benchmark']:<32}{row['baseline']:>12.0f}{row['current']:>12.0f}"
+            f"{row['change']:>+9.1%}{flag}"
+        )
+    return '\n'.join(lines)
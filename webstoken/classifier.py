@@ -2,13 +2,34 @@
 Text classification module using rule-based and statistical approaches.
 """
 
-from typing import Dict, List, Set, Tuple
-from collections import Counter
-import math
-import re
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
 
+import numpy as np
+
+from .automaton import KeywordAutomaton
+from .document import Document, as_document
 from .normalizer import TextNormalizer
+from .search import BM25Index, VectorIndex
+from .storage import StringArray, TermIndex, read_model, string_arrays, term_arrays, write_model
 from .tokenizer import WordTokenizer
+from .vectorizer import CSRMatrix, TfidfVectorizer
+
+
+class _StoredEntries(Sequence[Tuple[str, str]]):
+    """(category, document) pairs of a loaded model, decoded on access."""
+    
+    def __init__(self, categories: List[str], category_ids: np.ndarray, documents: StringArray):
+        self.categories = categories
+        self.category_ids = category_ids
+        self.documents = documents
+    
+    def __len__(self) -> int:
+        return len(self.documents)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        return self.categories[self.category_ids[index]], self.documents[index]
 
 
 class TextClassifier:
@@ -17,11 +38,35 @@ class TextClassifier:
     def __init__(self, embedding_type: str = 'tfidf'):
         self.word_tokenizer = WordTokenizer()
         self.normalizer = TextNormalizer()
-        self.documents: Dict[str, List[str]] = {}  # category -> list of documents
-        self.vocabulary: Set[str] = set()
-        self.idf_scores: Dict[str, float] = {}
-        self.category_vectors: Dict[str, Dict[str, float]] = {}
+        self._documents: Optional[Dict[str, List[str]]] = {}  # category -> list of documents
+        self.vectorizer = TfidfVectorizer()
+        self.categories: List[str] = []
+        self.centroids: np.ndarray = np.zeros((0, 0))  # L2-normalised, one row per category
         self.embedding_type = embedding_type
+        self.index: Union[BM25Index, VectorIndex, None] = None  # nearest-document search
+        self._entries: Sequence[Tuple[str, str]] = []  # index id -> (category, document)
+    
+    @property
+    def vocabulary(self) -> Mapping[str, int]:
+        """Term -> column index map of the TF-IDF space."""
+        return self.vectorizer.vocabulary
+    
+    @property
+    def documents(self) -> Dict[str, List[str]]:
+        """Training documents by category (read from the model files on first use after load())."""
+        if self._documents is None:
+            self._documents = {category: [] for category in self.categories}
+            for category, doc in self._entries:
+                self._documents.setdefault(category, []).append(doc)
+        return self._documents
+    
+    @documents.setter
+    def documents(self, documents: Dict[str, List[str]]) -> None:
+        self._documents = documents
+    
+    def _document(self, text: Union[str, Document]) -> Document:
+        """Wrap text in a Document that uses this classifier's components."""
+        return as_document(text, normalizer=self.normalizer, word_tokenizer=self.word_tokenizer)
     
     def train(self, documents: Dict[str, List[str]]) -> None:
         """
@@ -31,67 +76,182 @@ class TextClassifier:
             documents: Dict mapping categories to lists of documents
         """
         self._load_embeddings(self.embedding_type)
-        self.documents = documents
+        self.documents = {category: list(docs) for category, docs in documents.items()}
+        self.categories = list(documents)
+        self._entries = []
         
-        # Build vocabulary and document frequencies
-        doc_frequencies: Dict[str, int] = Counter()
-        total_docs = sum(len(docs) for docs in documents.values())
+        if self.embedding_type == 'tfidf':
+            # Tokenize every document once, then build the sparse document-term matrix
+            parsed = [self._document(doc) for docs in documents.values() for doc in docs]
+            token_lists = [document.tokens for document in parsed]
+            matrix = self.vectorizer.fit_transform(token_lists)
+            self.index = BM25Index()
+            self._add_to_index(documents, [document.lower_tokens for document in parsed])
+            
+            # Average the TF-IDF rows of each category into its centroid
+            centroids = np.zeros((len(self.categories), len(self.vocabulary)))
+            row_labels = np.repeat(
+                np.arange(len(self.categories)),
+                [len(docs) for docs in documents.values()]
+            )
+            np.add.at(centroids, (row_labels[matrix.row_ids()], matrix.indices), matrix.data)
+            centroids /= np.maximum([len(docs) for docs in documents.values()], 1)[:, None]
+        else:
+            dimension = self.embedding_model.get_sentence_embedding_dimension()
+            encoded = [
+                self._calculate_vector(docs) if docs else np.zeros((0, dimension))
+                for docs in documents.values()
+            ]
+            centroids = np.vstack([
+                np.mean(vectors, axis=0) if len(vectors) else np.zeros(dimension)
+                for vectors in encoded
+            ])
+            self.index = VectorIndex(dimension)
+            self._add_to_index(documents, np.vstack(encoded))
         
-        for category, docs in documents.items():
-            for doc in docs:
-                # Normalize and tokenize
-                doc = self.normalizer.normalize(doc)
-                tokens = self.word_tokenizer.tokenize(doc)
-                
-                # Update vocabulary and document frequencies
-                unique_tokens = set(tokens)
-                self.vocabulary.update(unique_tokens)
-                doc_frequencies.update(unique_tokens)
-        
-        # Calculate IDF scores
-        self.idf_scores = {
-            word: math.log(total_docs / (freq + 1))
-            for word, freq in doc_frequencies.items()
-        }
+        # Normalise once so scoring is a plain dot product
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = np.divide(centroids, norms, out=np.zeros_like(centroids), where=norms > 0)
+    
+    def _add_to_index(self, documents: Dict[str, List[str]],
+                      features: Union[List[List[str]], np.ndarray]) -> None:
+        """Add documents to the search index given their tokens or embeddings."""
+        self.index.add(features)
+        if not isinstance(self._entries, list):
+            self._entries = list(self._entries)
+        self._entries.extend((category, doc) for category, docs in documents.items() for doc in docs)
+    
+    def add_documents(self, documents: Dict[str, List[str]]) -> None:
+        """
+        Add labeled documents to the search index without retraining.
+        
+        Category centroids, and so classify(), only change on the next train().
+        
+        Args:
+            documents: Dict mapping categories to lists of documents
+        """
+        if self.index is None:
+            raise ValueError("Classifier must be trained before adding documents")
         
-        # Calculate TF-IDF vectors for each category
         for category, docs in documents.items():
-            category_vector: Dict[str, float] = {word: 0.0 for word in self.vocabulary}
-            
-            for doc in docs:
-                # Get term frequencies
-                doc = self.normalizer.normalize(doc)
-                tokens = self.word_tokenizer.tokenize(doc)
-                term_freqs = Counter(tokens)
-                
-                # Update category vector with TF-IDF scores
-                for word, tf in term_freqs.items():
-                    if word in self.idf_scores:
-                        category_vector[word] += tf * self.idf_scores[word]
-            
-            # Average the scores
-            for word in category_vector:
-                category_vector[word] /= len(docs)
+            self.documents.setdefault(category, []).extend(docs)
+        
+        texts = [doc for docs in documents.values() for doc in docs]
+        if isinstance(self.index, BM25Index):
+            features = [self._document(doc).lower_tokens for doc in texts]
+        else:
+            features = self._calculate_vector(texts) if texts else np.zeros((0, self.index.dimension))
+        self._add_to_index(documents, features)
+    
+    def search(self, query: Union[str, Document], k: int = 5) -> List[Tuple[str, str, float]]:
+        """
+        Find the stored training documents closest to a query.
+        
+        Uses BM25 in the TF-IDF mode and cosine similarity between embeddings
+        in the sentence-transformers mode.
+        
+        Args:
+            query: Query text or Document
+            k: Maximum number of results
             
-            self.category_vectors[category] = category_vector
+        Returns:
+            List of (category, document, score) tuples, best first
+        """
+        if self.index is None:
+            raise ValueError("Classifier must be trained before search")
+        
+        if isinstance(self.index, BM25Index):
+            hits = self.index.search(self._document(query).lower_tokens, k)
+        else:
+            hits = self.index.search(self._calculate_vector(query)[0], k)
+        return [self._entries[i] + (score,) for i, score in hits]
+    
+    def save(self, path: str) -> None:
+        """
+        Save the trained classifier to a model directory.
+        
+        Vocabulary, IDF weights, centroids, the search index and the training
+        documents are stored as .npy arrays that load() memory-maps, so worker
+        processes loading the same model share its pages, and documents are
+        only read when search() returns them. The sentence-transformers model
+        itself is not saved; load() fetches it again, but nothing is re-encoded.
+        
+        Args:
+            path: Target directory, created if missing
+        
+        Categories added by add_documents() are saved with their documents:
+        
+        >>> import tempfile
+        >>> classifier = TextClassifier()
+        >>> classifier.train({'pos': ['great product'], 'neg': ['awful service']})
+        >>> classifier.add_documents({'finance': ['stock prices rose']})
+        >>> with tempfile.TemporaryDirectory() as path:
+        ...     classifier.save(path)
+        ...     TextClassifier.load(path, mmap=False).search('stock prices')[0][:2]
+        ('finance', 'stock prices rose')
+        """
+        if self.index is None:
+            raise ValueError("Classifier must be trained before saving")
+        
+        index_meta, index_arrays = self.index.to_arrays()
+        # add_documents() can add categories that have no centroid yet
+        entry_categories = list(dict.fromkeys(self.categories + [category for category, _ in self._entries]))
+        meta = {
+            'embedding_type': self.embedding_type,
+            'categories': self.categories,
+            'entry_categories': entry_categories,
+            'index': index_meta
+        }
+        category_ids = {category: i for i, category in enumerate(entry_categories)}
+        arrays = {
+            'idf': self.vectorizer.idf,
+            'centroids': self.centroids,
+            'entry_categories': np.array([category_ids[category] for category, _ in self._entries], dtype=np.int64),
+            **term_arrays(self.vocabulary, 'vocabulary'),
+            **string_arrays((doc for _, doc in self._entries), 'documents')
+        }
+        arrays.update({f"index_{name}": array for name, array in index_arrays.items()})
+        write_model(path, 'TextClassifier', meta, arrays)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'TextClassifier':
+        """
+        Load a classifier saved with save().
+        
+        Args:
+            path: Model directory
+            mmap: Memory-map arrays read-only instead of reading them into memory
+        """
+        meta, arrays = read_model(path, 'TextClassifier', mmap)
+        
+        classifier = cls(meta['embedding_type'])
+        classifier._load_embeddings(classifier.embedding_type)
+        classifier.categories = meta['categories']
+        classifier.vectorizer.vocabulary = TermIndex(arrays, 'vocabulary')
+        classifier.vectorizer.idf = arrays['idf']
+        classifier.centroids = arrays['centroids']
+        
+        classifier._entries = _StoredEntries(meta['entry_categories'], arrays['entry_categories'],
+                                             StringArray(arrays, 'documents'))
+        classifier.documents = None  # Built from the entries on first use
+        
+        index_arrays = {name[len('index_'):]: array for name, array in arrays.items() if name.startswith('index_')}
+        index_type = BM25Index if classifier.embedding_type == 'tfidf' else VectorIndex
+        classifier.index = index_type.from_arrays(meta['index'], index_arrays)
+        return classifier
     
-    def _calculate_vector(self, text: str) -> Dict[str, float]:
-        """Calculate TF-IDF vector for input text."""
-        # Normalize and tokenize
-        text = self.normalizer.normalize(text)
-        tokens = self.word_tokenizer.tokenize(text)
-        term_freqs = Counter(tokens)
+    def _calculate_vector(self, text: Union[str, Document, List[Union[str, Document]]],
+                          batch_size: int = 32) -> Union[CSRMatrix, np.ndarray]:
+        """Calculate TF-IDF (sparse) or embedding (dense) vectors for input text."""
+        texts = text if isinstance(text, list) else [text]
+        documents = [self._document(t) for t in texts]
         
         if self.embedding_type == 'tfidf':
-            # Calculate TF-IDF scores
-            vector = {word: 0.0 for word in self.vocabulary}
-            for word, tf in term_freqs.items():
-                if word in self.idf_scores:
-                    vector[word] = tf * self.idf_scores[word]
-            return vector
+            return self.vectorizer.transform(document.tokens for document in documents)
         elif self.embedding_type == 'sentence-transformers':
-            
-            return self.embedding_model.encode(text)
+            texts = [document.normalized for document in documents]
+            return self.embedding_model.encode(texts, batch_size=batch_size,
+                                               normalize_embeddings=True)
         else:
             raise NotImplementedError(f"Embedding type '{self.embedding_type}' not implemented")
 
@@ -105,37 +265,43 @@ class TextClassifier:
         else:
             raise NotImplementedError(f"Loading embeddings for type '{embedding_type}' not implemented")
     
-    def _cosine_similarity(self, vec1: Dict[str, float], vec2: Dict[str, float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        dot_product = sum(vec1[word] * vec2[word] for word in vec1)
-        norm1 = math.sqrt(sum(score * score for score in vec1.values()))
-        norm2 = math.sqrt(sum(score * score for score in vec2.values()))
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        return dot_product / (norm1 * norm2)
-    
-    def classify(self, text: str) -> List[Tuple[str, float]]:
+    def classify(self, text: Union[str, Document]) -> List[Tuple[str, float]]:
         """
         Classify text into categories with confidence scores.
         
         Returns:
             List of (category, confidence) tuples, sorted by confidence
         """
-        if not self.category_vectors:
+        return self.classify_many([text])[0]
+    
+    def classify_many(self, texts: List[Union[str, Document]],
+                      batch_size: int = 32) -> List[List[Tuple[str, float]]]:
+        """
+        Classify a batch of texts with a single matrix multiply.
+        
+        Args:
+            texts: Input texts or Documents
+            batch_size: Encoding batch size for the sentence-transformers mode
+            
+        Returns:
+            One list of (category, confidence) tuples per text, sorted by confidence
+        """
+        if not self.categories:
             raise ValueError("Classifier must be trained before classification")
+        if not texts:
+            return []
         
-        # Calculate vector for input text
-        text_vector = self._calculate_vector(text)
+        vectors = self._calculate_vector(texts, batch_size=batch_size)
         
-        # Calculate similarity with each category
-        similarities = [
-            (category, self._cosine_similarity(text_vector, category_vec))
-            for category, category_vec in self.category_vectors.items()
-        ]
+        if isinstance(vectors, CSRMatrix):
+            # Cosine similarity: centroids are unit length, so only rows need normalising
+            norms = vectors.row_norms()[:, None]
+            scores = vectors.dot(self.centroids.T)
+            scores = np.divide(scores, norms, out=np.zeros_like(scores), where=norms > 0)
+        else:
+            scores = vectors @ self.centroids.T
         
-        # Sort by similarity score
-        return sorted(similarities, key=lambda x: x[1], reverse=True)
+        return [_rank(self.categories, row) for row in scores]
 
 
 class TopicClassifier:
@@ -176,31 +342,78 @@ class TopicClassifier:
             }
         }
         
-        # Compile regex patterns for each topic
-        self.topic_patterns = {
-            topic: re.compile(r'\b(' + '|'.join(re.escape(kw) for kw in keywords) + r')\b', re.IGNORECASE)
-            for topic, keywords in self.topic_keywords.items()
-        }
+        self._compile_keywords()
+    
+    def _compile_keywords(self) -> None:
+        """Compile all topic keywords into one automaton and a keyword -> topics map."""
+        keywords = sorted({kw.lower() for keywords in self.topic_keywords.values() for kw in keywords})
+        self.keyword_index: Dict[str, int] = {kw: i for i, kw in enumerate(keywords)}
+        
+        self.automaton = KeywordAutomaton()
+        for kw, i in self.keyword_index.items():
+            self.automaton.add(kw, i)
+        self.automaton.build()
+        
+        self.topics: List[str] = list(self.topic_keywords)
+        self.keyword_topics: List[List[int]] = [[] for _ in keywords]  # keyword -> topic indices
+        for j, topic in enumerate(self.topics):
+            for kw in {kw.lower() for kw in self.topic_keywords[topic]}:
+                self.keyword_topics[self.keyword_index[kw]].append(j)
+    
+    def add_topics(self, topics: Dict[str, Set[str]]) -> None:
+        """
+        Register custom topics or extend existing ones with more keywords.
+        
+        Args:
+            topics: Dict mapping topic names to keyword sets (multi-word keywords allowed)
+        
+        Each topic matches its keywords independently, so a keyword inside
+        another topic's longer keyword still counts:
+        
+        >>> classifier = TopicClassifier()
+        >>> classifier.add_topics({'EDUCATION': {'learning'}})
+        >>> classifier.classify('machine learning')[:2]
+        [('TECHNOLOGY', 0.5), ('EDUCATION', 0.5)]
+        """
+        for topic, keywords in topics.items():
+            self.topic_keywords.setdefault(topic, set()).update(keywords)
+        self._compile_keywords()
     
-    def classify(self, text: str) -> List[Tuple[str, float]]:
+    def classify(self, text: Union[str, Document]) -> List[Tuple[str, float]]:
         """
         Classify text into topics with confidence scores.
         
         Returns:
             List of (topic, confidence) tuples, sorted by confidence
         """
-        # Count keyword matches for each topic
-        topic_matches = {
-            topic: len(pattern.findall(text))
-            for topic, pattern in self.topic_patterns.items()
-        }
+        return self.classify_many([text])[0]
+    
+    def classify_many(self, texts: List[Union[str, Document]]) -> List[List[Tuple[str, float]]]:
+        """
+        Classify a batch of texts into topics.
+        
+        Returns:
+            One list of (topic, confidence) tuples per text, sorted by confidence
+        """
+        # Scan each text once regardless of the number of topics
+        counts = np.zeros((len(texts), len(self.topics)))
+        for row, text in zip(counts, texts):
+            # Leftmost-longest non-overlapping matches per topic, so one topic's
+            # keyword does not hide a shorter keyword of another topic
+            last_end = [0] * len(self.topics)
+            for start, end, value in self.automaton.find_all(as_document(text).text):
+                for j in self.keyword_topics[value]:
+                    if start >= last_end[j]:
+                        row[j] += 1
+                        last_end[j] = end
         
         # Calculate confidence scores
-        total_matches = sum(topic_matches.values()) or 1  # Avoid division by zero
-        topic_scores = [
-            (topic, count / total_matches)
-            for topic, count in topic_matches.items()
-        ]
-        
-        # Sort by score
-        return sorted(topic_scores, key=lambda x: x[1], reverse=True)
+        totals = counts.sum(axis=1, keepdims=True)
+        scores = counts / np.maximum(totals, 1)  # Avoid division by zero
+        
+        return [_rank(self.topics, row) for row in scores]
+
+
+def _rank(labels: List[str], scores: np.ndarray) -> List[Tuple[str, float]]:
+    """Pair labels with scores, sorted by score."""
+    return sorted(zip(labels, scores.tolist()), key=lambda x: x[1], reverse=True)
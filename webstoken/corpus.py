@@ -0,0 +1,122 @@
+"""
+Incremental corpus-level document frequency statistics.
+"""
+
+from typing import Iterable, List, MutableMapping
+import math
+
+import numpy as np
+
+from .storage import TermIndex, read_model, term_arrays, write_model
+
+
+class CorpusStats:
+    """
+    Document frequencies of terms over a corpus, updated incrementally.
+
+    Terms map to integer ids and frequencies live in a single int64 array,
+    so the stats stay compact for large vocabularies. Stats built on
+    different workers can be combined with merge().
+    """
+
+    def __init__(self):
+        self.term_ids: MutableMapping[str, int] = {}
+        self._doc_freqs = np.zeros(0, dtype=np.int64)
+        self.num_docs = 0
+
+    def __len__(self) -> int:
+        return len(self.term_ids)
+
+    @property
+    def doc_freqs(self) -> np.ndarray:
+        """Document frequency of every term, indexed by term id."""
+        return self._doc_freqs[:len(self.term_ids)]
+
+    def _ids(self, terms: Iterable[str], create: bool) -> np.ndarray:
+        """Ids of the distinct terms in first-seen order, registering new ones when create is set."""
+        if not self._doc_freqs.flags.writeable:
+            # Copy memory-mapped frequencies on the first update
+            self._doc_freqs = np.array(self._doc_freqs)
+        unique = list(dict.fromkeys(terms))
+        if create:
+            ids = [self.term_ids.setdefault(term, len(self.term_ids)) for term in unique]
+            if len(self.term_ids) > len(self._doc_freqs):
+                grown = np.zeros(max(len(self.term_ids), 2 * len(self._doc_freqs)), dtype=np.int64)
+                grown[:len(self._doc_freqs)] = self._doc_freqs
+                self._doc_freqs = grown
+        else:
+            missing = [term for term in unique if term not in self.term_ids]
+            if missing:
+                raise ValueError(f"Term '{missing[0]}' is not in the corpus statistics")
+            ids = [self.term_ids[term] for term in unique]
+        return np.asarray(ids, dtype=np.int64)
+
+    def add(self, terms: Iterable[str]) -> None:
+        """Count one document given its terms (repeats are counted once)."""
+        ids = self._ids(terms, create=True)
+        self._doc_freqs[ids] += 1
+        self.num_docs += 1
+
+    def remove(self, terms: Iterable[str]) -> None:
+        """Uncount a document previously added with the same terms."""
+        ids = self._ids(terms, create=False)
+        if not self.num_docs or (self._doc_freqs[ids] <= 0).any():
+            raise ValueError("Document was not added to the corpus statistics")
+        self._doc_freqs[ids] -= 1
+        self.num_docs -= 1
+
+    def merge(self, other: 'CorpusStats') -> 'CorpusStats':
+        """Add the counts of other, e.g. partial stats from another worker, and return self."""
+        terms = list(other.term_ids)
+        ids = self._ids(terms, create=True)
+        self._doc_freqs[ids] += other.doc_freqs[[other.term_ids[term] for term in terms]]
+        self.num_docs += other.num_docs
+        return self
+
+    def doc_freq(self, term: str) -> int:
+        """Number of documents containing term."""
+        term_id = self.term_ids.get(term)
+        return 0 if term_id is None else int(self._doc_freqs[term_id])
+
+    def idf(self, term: str) -> float:
+        """
+        Smoothed inverse document frequency.
+
+        Terms found in every document get 0 and unseen terms the highest weight.
+        """
+        return math.log((1 + self.num_docs) / (1 + self.doc_freq(term)))
+
+    def idf_many(self, terms: List[str]) -> np.ndarray:
+        """Smoothed inverse document frequencies of several terms."""
+        doc_freqs = np.array([self.doc_freq(term) for term in terms], dtype=np.float64)
+        return np.log((1 + self.num_docs) / (1 + doc_freqs))
+
+    def save(self, path: str) -> None:
+        """Save the statistics to a model directory."""
+        write_model(path, 'CorpusStats', {'num_docs': self.num_docs},
+                    {'doc_freqs': self.doc_freqs, **term_arrays(self.term_ids, 'terms')})
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False) -> 'CorpusStats':
+        """
+        Load statistics saved with save().
+
+        Args:
+            path: Model directory
+            mmap: Memory-map the frequencies read-only; they are copied
+                  into memory on the first update
+        """
+        meta, arrays = read_model(path, 'CorpusStats', mmap)
+        stats = cls()
+        stats.term_ids = TermIndex(arrays, 'terms')
+        stats._doc_freqs = arrays['doc_freqs']
+        stats.num_docs = meta['num_docs']
+        return stats
+
+    @classmethod
+    def merged(cls, parts: Iterable['CorpusStats']) -> 'CorpusStats':
+        """Combine several partial statistics into new statistics."""
+        stats = cls()
+        for part in parts:
+            stats.merge(part)
+        return stats
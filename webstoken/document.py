@@ -0,0 +1,117 @@
+"""
+Shared document representation with lazily computed, memoised analysis results.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+from functools import cached_property, lru_cache
+import operator
+
+from .normalizer import TextNormalizer
+from .tagger import POSTagger
+from .tokenizer import SentenceTokenizer, WordTokenizer
+
+
+@lru_cache(maxsize=None)
+def _default(component: type):
+    """Shared default instance of a text processing component."""
+    return component()
+
+
+class Document:
+    """
+    Text wrapper that computes each intermediate result at most once.
+
+    Pass the same Document to several analyzers and the text is normalised,
+    split and tokenised only on first use.
+    """
+
+    def __init__(self, text: str, normalize: bool = True,
+                 normalizer: Optional[TextNormalizer] = None,
+                 sentence_tokenizer: Optional[SentenceTokenizer] = None,
+                 word_tokenizer: Optional[WordTokenizer] = None,
+                 pos_tagger: Optional[POSTagger] = None):
+        self.text = text
+        self.normalize = normalize
+        self.normalizer = normalizer or _default(TextNormalizer)
+        self.sentence_tokenizer = sentence_tokenizer or _default(SentenceTokenizer)
+        self.word_tokenizer = word_tokenizer or _default(WordTokenizer)
+        self.pos_tagger = pos_tagger or _default(POSTagger)
+        self._ngrams: Dict[int, List[Tuple[str, ...]]] = {}
+        self._char_ngrams: Dict[int, List[str]] = {}
+
+    def __repr__(self) -> str:
+        preview = self.text if len(self.text) <= 40 else self.text[:37] + '...'
+        return f"Document({preview!r})"
+
+    @cached_property
+    def normalized(self) -> str:
+        """Normalized text (the raw text when normalization is disabled)."""
+        return self.normalizer.normalize(self.text) if self.normalize else self.text
+
+    @cached_property
+    def lowered(self) -> str:
+        """Lowercased raw text."""
+        return self.text.lower()
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """Sentences of the raw text, each normalized when normalization is enabled."""
+        # Split first: normalization strips the punctuation that ends sentences
+        sentences = self.sentence_tokenizer.tokenize(self.text)
+        if not self.normalize:
+            return sentences
+        normalized = (self.normalizer.normalize(sentence) for sentence in sentences)
+        return [sentence for sentence in normalized if sentence]
+
+    @cached_property
+    def sentence_tokens(self) -> List[List[str]]:
+        """Word tokens of each sentence."""
+        return [self.word_tokenizer.tokenize(sentence) for sentence in self.sentences]
+
+    @cached_property
+    def tokens(self) -> List[str]:
+        """Word tokens of the whole document."""
+        return [token for tokens in self.sentence_tokens for token in tokens]
+
+    @cached_property
+    def lower_tokens(self) -> List[str]:
+        """Lowercased word tokens of the whole document."""
+        return [token.lower() for token in self.tokens]
+
+    @cached_property
+    def sentence_pos_tags(self) -> List[List[Tuple[str, str]]]:
+        """(word, tag) pairs of each sentence."""
+        return self.pos_tagger.tag_many(self.sentence_tokens)
+
+    @cached_property
+    def pos_tags(self) -> List[Tuple[str, str]]:
+        """(word, tag) pairs of the whole document."""
+        return [pair for tagged in self.sentence_pos_tags for pair in tagged]
+
+    def ngrams(self, n: int) -> List[Tuple[str, ...]]:
+        """Lowercased word n-grams within sentences."""
+        if n not in self._ngrams:
+            self._ngrams[n] = [
+                tuple(token.lower() for token in tokens[i:i+n])
+                for tokens in self.sentence_tokens
+                for i in range(len(tokens) - n + 1)
+            ]
+        return self._ngrams[n]
+
+    def char_ngrams(self, n: int) -> List[str]:
+        """Character n-grams of the lowercased raw text."""
+        if n not in self._char_ngrams:
+            # Concatenate shifted copies of the text with C-level map calls
+            text = self.lowered
+            grams = text
+            for shift in range(1, n):
+                grams = map(operator.add, grams, text[shift:])
+            self._char_ngrams[n] = list(grams)
+        return self._char_ngrams[n]
+
+
+def as_document(text: Union[str, Document], **components) -> Document:
+    """Wrap text in a Document, passing existing Documents through unchanged."""
+    if isinstance(text, Document):
+        return text
+    return Document(text, **components)
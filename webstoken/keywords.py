@@ -2,21 +2,32 @@
 Keyword extraction module using statistical and graph-based approaches.
 """
 
-from typing import Dict, List, Set, Tuple
-from collections import Counter, defaultdict
-import math
-import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from collections import defaultdict
 
+import numpy as np
+
+from .corpus import CorpusStats
+from .document import Document, as_document
 from .tokenizer import WordTokenizer
 from .normalizer import TextNormalizer
+from .vectorizer import CSRMatrix
 
 
 class KeywordExtractor:
-    """Keyword extraction using TF-IDF and TextRank-inspired algorithms."""
+    """
+    Keyword extraction using TF-IDF and TextRank-inspired algorithms.
+    
+    Args:
+        corpus_stats: Optional corpus document frequencies; when set, word
+                      scores are weighted by IDF so corpus-wide common words
+                      rank lower
+    """
     
-    def __init__(self):
+    def __init__(self, corpus_stats: Optional[CorpusStats] = None):
         self.word_tokenizer = WordTokenizer()
         self.normalizer = TextNormalizer()
+        self.corpus_stats = corpus_stats
         
         # Common words to filter out beyond basic stop words
         self.filter_words: Set[str] = {
@@ -26,30 +37,54 @@ class KeywordExtractor:
             'still', 'way', 'take', 'took', 'get', 'got', 'go', 'went'
         }
     
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences using simple rules."""
-        text = re.sub(r'\s+', ' ', text)
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
+    def _is_candidate(self, word: str) -> bool:
+        """Check whether a token can be part of a keyword."""
+        word = word.lower()
+        return (word.isalnum() and
+                len(word) > 2 and
+                word not in self.filter_words and
+                word not in self.normalizer.stop_words)
     
-    def _calculate_word_scores(self, text: str) -> Dict[str, float]:
-        """Calculate word importance scores using frequency and position."""
-        # Normalize and tokenize text
-        text = self.normalizer.normalize(text)
-        sentences = self._split_into_sentences(text)
+    def _sentence_tokens(self, text: Union[str, Document, Iterable[str]]) -> List[List[str]]:
+        """
+        Tokens of each sentence of a text, Document or stream of sentences.
+        
+        Streams, such as SentenceTokenizer.iter_sentences over file chunks, are
+        consumed one sentence at a time without building the full text.
+        """
+        if isinstance(text, (str, Document)):
+            document = as_document(text, normalizer=self.normalizer, word_tokenizer=self.word_tokenizer)
+            return document.sentence_tokens
+        return list(self.word_tokenizer.iter_tokenize(self.normalizer.normalize(sentence) for sentence in text))
+    
+    def corpus_terms(self, text: Union[str, Document, Iterable[str]]) -> Set[str]:
+        """Distinct keyword candidates of a text, as counted by CorpusStats."""
+        return {word.lower() for words in self._sentence_tokens(text) for word in words
+                if self._is_candidate(word)}
+    
+    def fit_corpus(self, texts: Iterable[Union[str, Document]]) -> CorpusStats:
+        """
+        Add texts to the corpus statistics, creating them if needed.
         
+        Returns:
+            The updated corpus statistics
+        """
+        if self.corpus_stats is None:
+            self.corpus_stats = CorpusStats()
+        for text in texts:
+            self.corpus_stats.add(self.corpus_terms(text))
+        return self.corpus_stats
+    
+    def _calculate_word_scores(self, sentences: List[List[str]]) -> Dict[str, float]:
+        """Calculate word importance scores using frequency and position."""
         word_scores: Dict[str, float] = defaultdict(float)
         word_positions: Dict[str, List[int]] = defaultdict(list)
         
         # Calculate word frequencies and positions
-        for i, sentence in enumerate(sentences):
-            words = self.word_tokenizer.tokenize(sentence)
-            for j, word in enumerate(words):
-                word = word.lower()
-                if (word.isalnum() and 
-                    len(word) > 2 and
-                    word not in self.filter_words and
-                    word not in self.normalizer.stop_words):
+        for i, words in enumerate(sentences):
+            for word in words:
+                if self._is_candidate(word):
+                    word = word.lower()
                     word_scores[word] += 1
                     word_positions[word].append(i)
         
@@ -68,88 +103,97 @@ class KeywordExtractor:
         
         return word_scores
     
-    def _calculate_word_cooccurrence(self, text: str, window_size: int = 3) -> Dict[str, Dict[str, int]]:
-        """Calculate word co-occurrence matrix."""
-        # Normalize and tokenize text
-        text = self.normalizer.normalize(text)
-        words = self.word_tokenizer.tokenize(text)
-        
-        # Filter words
-        filtered_words = [
-            word.lower() for word in words
-            if (word.isalnum() and
-                len(word) > 2 and
-                word.lower() not in self.filter_words and
-                word.lower() not in self.normalizer.stop_words)
-        ]
+    def _build_cooccurrence_graph(self, sentences: List[List[str]],
+                                  window_size: int = 3) -> Tuple[List[str], CSRMatrix]:
+        """
+        Build the word co-occurrence graph as a sparse adjacency matrix.
         
-        # Build co-occurrence matrix
-        cooccurrence: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        Returns:
+            (nodes, adjacency) where adjacency[i, j] is the co-occurrence weight
+            of nodes[i] and nodes[j]
+        """
+        filtered_words = [word.lower() for words in sentences for word in words if self._is_candidate(word)]
         
-        for i, word in enumerate(filtered_words):
-            for j in range(max(0, i - window_size), min(len(filtered_words), i + window_size + 1)):
-                if i != j:
-                    cooccurrence[word][filtered_words[j]] += 1
-                    cooccurrence[filtered_words[j]][word] += 1
+        node_index: Dict[str, int] = {}
+        ids = np.fromiter(
+            (node_index.setdefault(word, len(node_index)) for word in filtered_words),
+            dtype=np.int64, count=len(filtered_words)
+        )
+        num_nodes = len(node_index)
+        
+        # Every pair of positions within the window links both words in both
+        # directions, and is visited once from each side
+        sources = [ids[:-k] for k in range(1, window_size + 1) if k < len(ids)]
+        targets = [ids[k:] for k in range(1, window_size + 1) if k < len(ids)]
+        if sources:
+            sources, targets = np.concatenate(sources), np.concatenate(targets)
+            rows = np.concatenate([sources, targets])
+            cols = np.concatenate([targets, sources])
+        else:
+            rows = cols = np.zeros(0, dtype=np.int64)
         
-        return cooccurrence
+        adjacency = CSRMatrix.from_coo(rows, cols, np.full(len(rows), 2.0), (num_nodes, num_nodes))
+        return list(node_index), adjacency
     
-    def _textrank_scores(self, cooccurrence: Dict[str, Dict[str, int]], damping: float = 0.85,
-                        iterations: int = 30) -> Dict[str, float]:
-        """Calculate TextRank scores from co-occurrence matrix."""
-        scores = {word: 1.0 for word in cooccurrence}
+    def _textrank_scores(self, graph: Tuple[List[str], CSRMatrix], damping: float = 0.85,
+                         iterations: int = 30, tolerance: float = 0.0001) -> Dict[str, float]:
+        """Calculate TextRank scores from the co-occurrence graph by power iteration."""
+        nodes, adjacency = graph
+        out_degree = adjacency.row_sums()
+        connected = out_degree > 0
+        
+        # Precompute the out-degree normalisation once
+        inverse_degree = np.divide(1.0, out_degree, out=np.zeros_like(out_degree), where=connected)
+        scores = np.ones(len(nodes))
         
         for _ in range(iterations):
-            new_scores = {}
-            for word in scores:
-                if not cooccurrence[word]:
-                    continue
-                    
-                incoming_score = sum(
-                    scores[other] * cooccurrence[word][other] / sum(cooccurrence[other].values())
-                    for other in cooccurrence[word]
-                )
-                new_scores[word] = (1 - damping) + damping * incoming_score
+            new_scores = (1 - damping) + damping * adjacency.matvec(scores * inverse_degree)
             
             # Check convergence
-            score_diff = sum(abs(new_scores[w] - scores[w]) for w in scores)
+            score_diff = np.abs(new_scores - scores)[connected].sum()
             scores = new_scores
-            if score_diff < 0.0001:
+            if score_diff < tolerance:
                 break
         
+        return {node: score for node, score, keep in zip(nodes, scores.tolist(), connected) if keep}
+    
+    def _score_words(self, sentences: List[List[str]], use_textrank: bool) -> Dict[str, float]:
+        """Combine frequency scores with TextRank scores from the same token stream."""
+        freq_scores = self._calculate_word_scores(sentences)
+        
+        if use_textrank:
+            textrank_scores = self._textrank_scores(self._build_cooccurrence_graph(sentences))
+            scores = {
+                word: freq_scores[word] * textrank_scores.get(word, 0)
+                for word in freq_scores
+            }
+        else:
+            scores = freq_scores
+        
+        if self.corpus_stats is not None and scores:
+            words = list(scores)
+            idf = self.corpus_stats.idf_many(words)
+            scores = {word: scores[word] * weight for word, weight in zip(words, idf.tolist())}
         return scores
     
-    def extract_keywords(self, text: str, num_keywords: int = 10,
+    def extract_keywords(self, text: Union[str, Document, Iterable[str]], num_keywords: int = 10,
                         use_textrank: bool = True) -> List[Tuple[str, float]]:
         """
         Extract keywords from text using combined frequency and graph-based approach.
         
         Args:
-            text: Input text
+            text: Input text, Document or iterable of sentences
             num_keywords: Number of keywords to return
             use_textrank: Whether to use TextRank algorithm
             
         Returns:
             List of (keyword, score) tuples, sorted by score
         """
-        if not text:
+        sentences = self._sentence_tokens(text)
+        if not sentences:
             return []
         
-        # Get frequency-based scores
-        freq_scores = self._calculate_word_scores(text)
-        
-        if use_textrank:
-            # Get TextRank scores
-            cooccurrence = self._calculate_word_cooccurrence(text)
-            textrank_scores = self._textrank_scores(cooccurrence)
-            
-            # Combine scores
-            combined_scores = {
-                word: freq_scores[word] * textrank_scores.get(word, 0)
-                for word in freq_scores
-            }
-        else:
-            combined_scores = freq_scores
+        combined_scores = self._score_words(sentences, use_textrank)
         
         # Sort and return top keywords
         sorted_words = sorted(
@@ -160,46 +204,38 @@ class KeywordExtractor:
         
         return sorted_words[:num_keywords]
     
-    def extract_keyphrases(self, text: str, num_phrases: int = 5,
-                          min_words: int = 2, max_words: int = 4) -> List[Tuple[str, float]]:
+    def extract_keyphrases(self, text: Union[str, Document, Iterable[str]], num_phrases: int = 5,
+                          min_words: int = 2, max_words: int = 4,
+                          use_textrank: bool = False) -> List[Tuple[str, float]]:
         """
         Extract key phrases from text.
         
         Args:
-            text: Input text
+            text: Input text, Document or iterable of sentences
             num_phrases: Number of phrases to return
             min_words: Minimum words in phrase
             max_words: Maximum words in phrase
+            use_textrank: Whether to weight phrase words by TextRank scores
             
         Returns:
             List of (phrase, score) tuples, sorted by score
         """
-        # Normalize and split into sentences
-        text = self.normalizer.normalize(text)
-        sentences = self._split_into_sentences(text)
-        
-        # Get word importance scores
-        word_scores = self._calculate_word_scores(text)
+        # Tokenize once and reuse the tokens for word scores and phrase candidates
+        sentences = self._sentence_tokens(text)
+        word_scores = self._score_words(sentences, use_textrank)
         
         # Extract candidate phrases
         phrases: Dict[str, float] = {}
         
-        for sentence in sentences:
-            words = self.word_tokenizer.tokenize(sentence)
+        for words in sentences:
+            candidates = [self._is_candidate(word) for word in words]
             
             # Generate phrases of different lengths
             for i in range(len(words)):
                 for length in range(min_words, min(max_words + 1, len(words) - i + 1)):
-                    phrase_words = words[i:i+length]
-                    
                     # Filter phrases
-                    if all(
-                        word.isalnum() and
-                        len(word) > 2 and
-                        word.lower() not in self.filter_words and
-                        word.lower() not in self.normalizer.stop_words
-                        for word in phrase_words
-                    ):
+                    if all(candidates[i:i+length]):
+                        phrase_words = words[i:i+length]
                         phrase = ' '.join(phrase_words)
                         # Score is average of word scores
                         score = sum(word_scores.get(word.lower(), 0) for word in phrase_words)
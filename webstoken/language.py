@@ -2,14 +2,21 @@
 Language detection module using character and word frequency analysis.
 """
 
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
 from collections import Counter
 import re
 
+import numpy as np
+
+from .document import Document, as_document
+
 
 class LanguageDetector:
     """Language detection using character n-gram frequencies."""
     
+    # Weight of each feature kind in the combined score
+    FEATURE_WEIGHTS: Dict[str, float] = {'chars': 0.3, 'ngrams': 0.4, 'words': 0.3}
+    
     def __init__(self):
         # Language profiles based on common character sequences
         self.language_profiles = {
@@ -53,76 +60,92 @@ class LanguageDetector:
         
         # Compile word patterns
         self.word_pattern = re.compile(r'\b\w+\b')
+        self.compile_profiles()
     
-    def _extract_ngrams(self, text: str, n: int = 2) -> List[str]:
-        """Extract character n-grams from text."""
-        text = text.lower()
-        return [text[i:i+n] for i in range(len(text)-n+1)]
-    
-    def _calculate_char_frequencies(self, text: str) -> Dict[str, float]:
-        """Calculate character frequencies in text."""
-        text = text.lower()
-        char_count = Counter(c for c in text if c.isalpha())
-        total = sum(char_count.values()) or 1
-        return {char: count/total for char, count in char_count.items()}
-    
-    def _calculate_ngram_frequencies(self, text: str) -> Dict[str, float]:
-        """Calculate n-gram frequencies in text."""
-        ngrams = self._extract_ngrams(text)
-        ngram_count = Counter(ngrams)
-        total = sum(ngram_count.values()) or 1
-        return {ngram: count/total for ngram, count in ngram_count.items()}
-    
-    def _calculate_word_frequencies(self, text: str) -> Dict[str, float]:
-        """Calculate word frequencies in text."""
-        words = self.word_pattern.findall(text.lower())
-        word_count = Counter(words)
-        total = sum(word_count.values()) or 1
-        return {word: count/total for word, count in word_count.items()}
+    def compile_profiles(self) -> None:
+        """
+        Compile language profiles into a (languages x features) weight matrix.
+        
+        Call this again after adding or changing entries in language_profiles.
+        """
+        self.languages: List[str] = list(self.language_profiles)
+        
+        # One shared index space per feature kind
+        self._feature_index: Dict[str, Dict[str, int]] = {'chars': {}, 'ngrams': {}, 'words': {}}
+        for profile in self.language_profiles.values():
+            for kind, index in self._feature_index.items():
+                for feature in profile[kind]:
+                    index.setdefault(feature, len(index))
+        
+        self._offsets = {
+            'chars': 0,
+            'ngrams': len(self._feature_index['chars']),
+            'words': len(self._feature_index['chars']) + len(self._feature_index['ngrams'])
+        }
+        num_features = self._offsets['words'] + len(self._feature_index['words'])
+        
+        self._weights = np.zeros((len(self.languages), num_features))
+        for row, lang in enumerate(self.languages):
+            for kind, weight in self.FEATURE_WEIGHTS.items():
+                offset, index = self._offsets[kind], self._feature_index[kind]
+                # 'chars' is a string; repeated characters count once per occurrence
+                for feature in self.language_profiles[lang][kind]:
+                    self._weights[row, offset + index[feature]] += weight
     
-    def _calculate_similarity(self, freq1: Dict[str, float], freq2: Dict[str, float]) -> float:
-        """Calculate similarity between two frequency distributions."""
-        common_keys = set(freq1.keys()) & set(freq2.keys())
-        if not common_keys:
-            return 0.0
+    def _histogram(self, document: Document) -> np.ndarray:
+        """Relative frequencies of the input in the compiled feature space."""
+        histogram = np.zeros(self._weights.shape[1])
+        
+        char_count = Counter(document.lowered)
+        char_count = Counter({c: count for c, count in char_count.items() if c.isalpha()})
+        ngram_count = Counter(document.char_ngrams(2))
+        word_count = Counter(self.word_pattern.findall(document.lowered))
         
-        similarity = sum(min(freq1.get(k, 0), freq2.get(k, 0)) for k in common_keys)
-        return similarity
+        for kind, counts in (('chars', char_count), ('ngrams', ngram_count), ('words', word_count)):
+            offset, index = self._offsets[kind], self._feature_index[kind]
+            total = sum(counts.values()) or 1
+            for feature, count in counts.items():
+                column = index.get(feature)
+                if column is not None:
+                    histogram[offset + column] = count / total
+        
+        return histogram
+    
+    def _scores(self, document: Document) -> np.ndarray:
+        """Normalised scores of every language."""
+        # Combined score (weighted sum) for all languages at once
+        scores = self._weights @ self._histogram(document)
+        total = scores.sum() or 1
+        return scores / total
     
-    def detect(self, text: str) -> List[Tuple[str, float]]:
+    def detect(self, text: Union[str, Document], prefix_chars: Optional[int] = None,
+               min_ratio: float = 1.25) -> List[Tuple[str, float]]:
         """
-        Detect the language of text with confidence scores.
+        Detect the language of text or a Document with confidence scores.
+        
+        Args:
+            text: Input text or Document
+            prefix_chars: If set, first score only this many leading characters and
+                          return that result when it is already confident
+            min_ratio: Required ratio between the best and second-best prefix
+                       scores for the prefix result to be accepted
         
         Returns:
             List of (language, confidence) tuples, sorted by confidence
         """
-        if not text:
+        document = as_document(text)
+        if not document.text:
             return []
         
-        # Calculate frequencies for input text
-        char_freqs = self._calculate_char_frequencies(text)
-        ngram_freqs = self._calculate_ngram_frequencies(text)
-        word_freqs = self._calculate_word_frequencies(text)
-        
-        # Calculate similarity scores for each language
-        scores = []
-        for lang, profile in self.language_profiles.items():
-            # Character similarity
-            char_sim = sum(char_freqs.get(c, 0) for c in profile['chars'])
-            
-            # N-gram similarity
-            ngram_sim = sum(ngram_freqs.get(ng, 0) for ng in profile['ngrams'])
-            
-            # Word similarity
-            word_sim = sum(word_freqs.get(w, 0) for w in profile['words'])
-            
-            # Combined score (weighted average)
-            total_score = (0.3 * char_sim + 0.4 * ngram_sim + 0.3 * word_sim)
-            scores.append((lang, total_score))
+        scores = None
+        if prefix_chars and len(document.text) > prefix_chars:
+            scores = self._scores(Document(document.text[:prefix_chars]))
+            top = np.sort(scores)[::-1]
+            if top[0] <= 0 or (len(top) > 1 and top[0] < min_ratio * top[1]):
+                scores = None
         
-        # Normalize scores
-        total = sum(score for _, score in scores) or 1
-        normalized_scores = [(lang, score/total) for lang, score in scores]
+        if scores is None:
+            scores = self._scores(document)
         
         # Sort by confidence
-        return sorted(normalized_scores, key=lambda x: x[1], reverse=True)
+        return sorted(zip(self.languages, scores.tolist()), key=lambda x: x[1], reverse=True)
@@ -2,13 +2,29 @@
 Named Entity Recognition (NER) module for identifying and classifying named entities.
 """
 
-from typing import List, Tuple, Dict, Set
+from typing import List, NamedTuple, Tuple, Dict, Set, Union
 import re
 
+from .document import Document, as_document
+
+
+class EntitySpan(NamedTuple):
+    """Entity found at text[start:end]."""
+    start: int
+    end: int
+    label: str
+    text: str
+
 
 class NamedEntityRecognizer:
     """Rule-based Named Entity Recognition."""
     
+    # Entity types in output order; later types win where entities overlap
+    ENTITY_TYPES: Tuple[str, ...] = (
+        'PERSON', 'ORGANIZATION', 'LOCATION', 'DATE', 'TIME',
+        'MONEY', 'EMAIL', 'URL', 'PHONE', 'PERCENTAGE'
+    )
+    
     def __init__(self):
         # Common entity patterns
         self.PERSON_TITLES = {
@@ -42,38 +58,37 @@ class NamedEntityRecognizer:
             'MONEY': re.compile(r'\$\d+(?:,\d{3})*(?:\.\d{2})?|\d+(?:,\d{3})*(?:\.\d{2})?\s*(?:dollars|USD|EUR|GBP)'),
             'PERCENTAGE': re.compile(r'\b\d+(?:\.\d+)?%\b')
         }
+        self.word_pattern = re.compile(r'\S+')
+        self._precedence = {label: i for i, label in enumerate(self.ENTITY_TYPES)}
     
     def is_capitalized(self, word: str) -> bool:
         """Check if a word is capitalized."""
         return word and word[0].isupper()
     
-    def extract_entities(self, text: str) -> Dict[str, List[Tuple[str, str]]]:
+    def extract_spans(self, text: Union[str, Document]) -> List[EntitySpan]:
         """
-        Extract named entities from text.
+        Find entities as character-offset spans in one pass over the text.
         
         Returns:
-            Dict mapping entity types to list of (text, label) tuples
+            List of EntitySpan tuples sorted by start offset
         """
-        entities = {
-            'PERSON': [],
-            'ORGANIZATION': [],
-            'LOCATION': [],
-            'DATE': [],
-            'TIME': [],
-            'MONEY': [],
-            'EMAIL': [],
-            'URL': [],
-            'PHONE': [],
-            'PERCENTAGE': []
-        }
+        # NER relies on capitalisation and punctuation, so it reads the raw text
+        text = as_document(text).text
         
         # First find regex pattern matches
-        for label, pattern in self.patterns.items():
-            for match in pattern.finditer(text):
-                entities[label].append((match.group(), label))
+        spans = [
+            EntitySpan(match.start(), match.end(), label, match.group())
+            for label, pattern in self.patterns.items()
+            for match in pattern.finditer(text)
+        ]
         
         # Process text word by word for other entities
-        words = text.split()
+        matches = list(self.word_pattern.finditer(text))
+        words = [match.group() for match in matches]
+        
+        def word_span(first: int, last: int, label: str, parts: List[str]) -> EntitySpan:
+            return EntitySpan(matches[first].start(), matches[last].end(), label, ' '.join(parts))
+        
         i = 0
         while i < len(words):
             word = words[i]
@@ -81,84 +96,92 @@ class NamedEntityRecognizer:
             
             # Check for person names
             if word.lower() in self.PERSON_TITLES and next_word and self.is_capitalized(next_word):
-                name_parts = []
                 j = i + 1
                 while j < len(words) and self.is_capitalized(words[j]):
-                    name_parts.append(words[j])
                     j += 1
-                if name_parts:
-                    entities['PERSON'].append((' '.join(name_parts), 'PERSON'))
+                spans.append(word_span(i + 1, j - 1, 'PERSON', words[i + 1:j]))
                 i = j
                 continue
             
             # Check for organizations
             if self.is_capitalized(word):
-                org_parts = [word]
                 j = i + 1
                 while j < len(words) and (
                     self.is_capitalized(words[j]) or 
                     words[j].lower() in self.ORGANIZATION_SUFFIXES
                 ):
-                    org_parts.append(words[j])
                     j += 1
-                if len(org_parts) > 1 or (
-                    len(org_parts) == 1 and 
-                    any(suff in word.lower() for suff in self.ORGANIZATION_SUFFIXES)
-                ):
-                    entities['ORGANIZATION'].append((' '.join(org_parts), 'ORGANIZATION'))
+                if j - i > 1 or any(suff in word.lower() for suff in self.ORGANIZATION_SUFFIXES):
+                    spans.append(word_span(i, j - 1, 'ORGANIZATION', words[i:j]))
                 i = j
                 continue
             
             # Check for locations
             if word.lower() in self.LOCATION_INDICATORS and i > 0:
                 if self.is_capitalized(words[i - 1]):
-                    entities['LOCATION'].append((words[i - 1] + ' ' + word, 'LOCATION'))
+                    spans.append(word_span(i - 1, i, 'LOCATION', words[i - 1:i + 1]))
             
             i += 1
         
-        return entities
+        spans.sort(key=lambda span: (span.start, span.end))
+        return spans
+    
+    def extract_entities(self, text: Union[str, Document]) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Extract named entities from text or a Document.
         
-    def tag_text(self, text: str) -> List[Tuple[str, str]]:
+        Returns:
+            Dict mapping entity types to list of (text, label) tuples
+        """
+        entities: Dict[str, List[Tuple[str, str]]] = {label: [] for label in self.ENTITY_TYPES}
+        for span in self.extract_spans(text):
+            entities[span.label].append((span.text, span.label))
+        return entities
+    
+    def tag_text(self, text: Union[str, Document]) -> List[Tuple[str, str]]:
         """
-        Tag each word in text with its entity type.
+        Tag each word in text or a Document with its entity type.
+        
+        A word takes the label of its last character covered by an entity;
+        where entities overlap, later types in ENTITY_TYPES take precedence.
         
         Returns:
             List of (word, entity_type) tuples
         """
-        entities = self.extract_entities(text)
+        text = as_document(text).text
+        spans = self.extract_spans(text)
         tagged = []
         
-        # Create a map of word positions to entity labels
-        position_labels = {}
-        text_lower = text.lower()
-        
-        for entity_type, entity_list in entities.items():
-            for entity_text, _ in entity_list:
-                start = text_lower.find(entity_text.lower())
-                if start != -1:
-                    end = start + len(entity_text)
-                    for pos in range(start, end):
-                        position_labels[pos] = entity_type
-        
-        # Tag each character position
-        current_pos = 0
-        current_word = []
-        current_label = 'O'  # Outside any entity
-        
-        for char in text:
-            if char.isspace():
-                if current_word:
-                    tagged.append((''.join(current_word), current_label))
-                    current_word = []
-                    current_label = 'O'
+        # Sweep words and sorted spans together, keeping only spans that can
+        # still overlap the current word
+        active: List[EntitySpan] = []
+        next_span = 0
+        for match in self.word_pattern.finditer(text):
+            start, end = match.span()
+            while next_span < len(spans) and spans[next_span].start < end:
+                active.append(spans[next_span])
+                next_span += 1
+            if active:
+                active = [span for span in active if span.end > start]
+            
+            if not active:
+                label = 'O'  # Outside any entity
+            elif len(active) == 1:
+                label = active[0].label
             else:
-                current_word.append(char)
-                if current_pos in position_labels:
-                    current_label = position_labels[current_pos]
-            current_pos += 1
-        
-        # Add last word if exists
-        if current_word:
-            tagged.append((''.join(current_word), current_label))
+                last = max(min(span.end, end) for span in active) - 1
+                label = max(
+                    (span for span in active if span.start <= last < span.end),
+                    key=lambda span: self._precedence[span.label]
+                ).label
+            tagged.append((match.group(), label))
         
         return tagged
+    
+    def extract_entities_many(self, texts: List[Union[str, Document]]) -> List[Dict[str, List[Tuple[str, str]]]]:
+        """Extract entities from many documents."""
+        return [self.extract_entities(text) for text in texts]
+    
+    def tag_many(self, texts: List[Union[str, Document]]) -> List[List[Tuple[str, str]]]:
+        """Tag the words of many documents."""
+        return [self.tag_text(text) for text in texts]
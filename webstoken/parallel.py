@@ -0,0 +1,118 @@
+"""
+Multiprocess bulk text processing.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+from collections import deque
+from itertools import islice
+import multiprocessing
+import os
+
+from .processor import TextPipeline
+from .keywords import KeywordExtractor
+from .sentiment import SentimentAnalyzer
+from .ner import NamedEntityRecognizer
+from .language import LanguageDetector
+
+
+# Task name -> factory returning the per-text callable. Factories run once per
+# worker process, so analyzers are built there instead of being pickled per task.
+TASKS: Dict[str, Callable[[], Callable[..., Any]]] = {
+    'process_text': lambda: TextPipeline().process,
+    'keywords': lambda: KeywordExtractor().extract_keywords,
+    'keyphrases': lambda: KeywordExtractor().extract_keyphrases,
+    'sentiment': lambda: SentimentAnalyzer().analyze_sentiment,
+    'emotions': lambda: SentimentAnalyzer().analyze_emotions,
+    'entities': lambda: NamedEntityRecognizer().extract_entities,
+    'language': lambda: LanguageDetector().detect,
+}
+
+_worker_fn: Optional[Callable[..., Any]] = None
+_worker_kwargs: Dict[str, Any] = {}
+
+
+def _init_worker(task: Union[str, Callable[[], Callable[..., Any]]], kwargs: Dict[str, Any]) -> None:
+    """Build the task's analyzer once in each worker process."""
+    global _worker_fn, _worker_kwargs
+    factory = TASKS[task] if isinstance(task, str) else task
+    _worker_fn = factory()
+    _worker_kwargs = kwargs
+
+
+def _run_chunk(chunk: List[str]) -> List[Any]:
+    """Apply the worker's analyzer to a chunk of texts."""
+    return [_worker_fn(text, **_worker_kwargs) for text in chunk]
+
+
+def _chunked(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Split an iterable into lists of at most size items."""
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelProcessor:
+    """
+    Run a webstoken analyzer over many texts on a process pool.
+
+    Texts are sent to workers in chunks and results come back in input order.
+    At most max_pending chunks are in flight, so memory stays bounded even
+    when the input is a large generator.
+
+    Args:
+        task: Name from TASKS, or a picklable module-level factory that
+              returns a callable taking one text
+        processes: Number of worker processes (defaults to CPU count)
+        chunksize: Number of texts sent to a worker at once
+        max_pending: Maximum number of chunks in flight (defaults to 2 per process)
+        **task_kwargs: Extra keyword arguments passed with every text,
+                       e.g. num_keywords=5
+    """
+
+    def __init__(self, task: Union[str, Callable[[], Callable[..., Any]]] = 'process_text',
+                 processes: Optional[int] = None, chunksize: int = 256,
+                 max_pending: Optional[int] = None, **task_kwargs):
+        if isinstance(task, str) and task not in TASKS:
+            raise ValueError(f"Unknown task '{task}'. Available tasks: {', '.join(TASKS)}")
+
+        self.processes = processes or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.max_pending = max_pending or 2 * self.processes
+        self.pool = multiprocessing.Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(task, task_kwargs)
+        )
+
+    def imap(self, texts: Iterable[str]) -> Iterator[Any]:
+        """Lazily yield one result per text, in input order."""
+        pending = deque()
+        for chunk in _chunked(texts, self.chunksize):
+            pending.append(self.pool.apply_async(_run_chunk, (chunk,)))
+            if len(pending) >= self.max_pending:
+                yield from pending.popleft().get()
+
+        while pending:
+            yield from pending.popleft().get()
+
+    def map(self, texts: Iterable[str]) -> List[Any]:
+        """Return all results as a list, in input order."""
+        return list(self.imap(texts))
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self) -> 'ParallelProcessor':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.pool.terminate()
+            self.pool.join()
@@ -2,14 +2,121 @@
 Main text processing utilities combining all NLP components.
 """
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from functools import lru_cache
+import time
 
 from .tokenizer import SentenceTokenizer, WordTokenizer
 from .tagger import POSTagger
-from .stemmer import Stemmer
+from .stemmer import CachedStemmer, Stemmer
 from .normalizer import TextNormalizer
 
 
+class TextPipeline:
+    """
+    Reusable text processing pipeline.
+    
+    Components are built once and shared by every call, so constructing a
+    pipeline is the only expensive step. Any stage can be swapped by passing
+    a compatible component or assigning the attribute later.
+    """
+    
+    STAGES: Tuple[str, ...] = ('normalize', 'sentences', 'tokens', 'stop_words', 'pos_tags', 'stems')
+    
+    def __init__(self, normalize: bool = True, remove_stops: bool = True,
+                 normalizer: Optional[TextNormalizer] = None,
+                 sentence_tokenizer: Optional[SentenceTokenizer] = None,
+                 word_tokenizer: Optional[WordTokenizer] = None,
+                 pos_tagger: Optional[POSTagger] = None,
+                 stemmer: Optional[Stemmer] = None):
+        self.normalize = normalize
+        self.remove_stops = remove_stops
+        self.normalizer = normalizer or TextNormalizer()
+        self.sentence_tokenizer = sentence_tokenizer or SentenceTokenizer()
+        self.word_tokenizer = word_tokenizer or WordTokenizer()
+        self.pos_tagger = pos_tagger or POSTagger()
+        self.stemmer = stemmer or CachedStemmer()
+        self.reset_stats()
+    
+    def reset_stats(self) -> None:
+        """Reset per-stage timing counters."""
+        self.stats: Dict[str, Dict[str, float]] = {
+            stage: {'calls': 0, 'seconds': 0.0} for stage in self.STAGES
+        }
+    
+    def _record(self, stage: str, started: float) -> float:
+        """Add elapsed time since started to a stage and return the current time."""
+        now = time.perf_counter()
+        counter = self.stats[stage]
+        counter['calls'] += 1
+        counter['seconds'] += now - started
+        return now
+    
+    def process(self, text: str) -> Dict[str, Any]:
+        """
+        Process a single text.
+        
+        Returns:
+            Dict with the same structure as process_text
+        """
+        started = time.perf_counter()
+        
+        if self.normalize:
+            text = self.normalizer.normalize(text)
+            started = self._record('normalize', started)
+        
+        # Get sentences
+        sentences = self.sentence_tokenizer.tokenize(text)
+        started = self._record('sentences', started)
+        
+        # Tokenize words
+        token_lists = [self.word_tokenizer.tokenize(sentence) for sentence in sentences]
+        started = self._record('tokens', started)
+        
+        # Remove stop words if requested
+        if self.remove_stops:
+            token_lists = [self.normalizer.remove_stop_words(tokens) for tokens in token_lists]
+            started = self._record('stop_words', started)
+        
+        # Get POS tags and stems, handling each distinct word once
+        tagged_lists = self.pos_tagger.tag_many(token_lists)
+        started = self._record('pos_tags', started)
+        stems = iter(self.stemmer.stem_many([token for tagged in tagged_lists for token, _ in tagged]))
+        stem_lists = [[(token, next(stems)) for token, _ in tagged] for tagged in tagged_lists]
+        started = self._record('stems', started)
+        
+        processed_sentences = [
+            {
+                'original': sentence,
+                'tokens': tokens,
+                'pos_tags': tagged,
+                'stems': stemmed
+            }
+            for sentence, tokens, tagged, stemmed in zip(sentences, token_lists, tagged_lists, stem_lists)
+        ]
+        
+        return {
+            'sentences': processed_sentences,
+            'num_sentences': len(sentences),
+            'num_tokens': sum(len(s['tokens']) for s in processed_sentences)
+        }
+    
+    def process_many(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """Process a batch of texts."""
+        return [self.process(text) for text in texts]
+    
+    def process_stream(self, texts: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Lazily process texts from any iterable, yielding one result at a time."""
+        for text in texts:
+            yield self.process(text)
+
+
+@lru_cache(maxsize=None)
+def _default_pipeline(normalize: bool, remove_stops: bool) -> TextPipeline:
+    """Shared pipeline used by process_text."""
+    return TextPipeline(normalize=normalize, remove_stops=remove_stops)
+
+
 def process_text(text: str, normalize: bool = True, remove_stops: bool = True) -> Dict[str, Any]:
     """
     Process text using all available NLP tools.
@@ -35,43 +142,4 @@ def process_text(text: str, normalize: bool = True, remove_stops: bool = True) -
             'num_tokens': int      # Total number of tokens
         }
     """
-    # Initialize tools
-    sentence_tokenizer = SentenceTokenizer()
-    word_tokenizer = WordTokenizer()
-    pos_tagger = POSTagger()
-    stemmer = Stemmer()
-    normalizer = TextNormalizer()
-    
-    # Process text
-    if normalize:
-        text = normalizer.normalize(text)
-    
-    # Get sentences
-    sentences = sentence_tokenizer.tokenize(text)
-    
-    # Process each sentence
-    processed_sentences = []
-    for sentence in sentences:
-        # Tokenize words
-        tokens = word_tokenizer.tokenize(sentence)
-        
-        # Remove stop words if requested
-        if remove_stops:
-            tokens = normalizer.remove_stop_words(tokens)
-        
-        # Get POS tags and stems
-        tagged = pos_tagger.tag(tokens)
-        stems = [(token, stemmer.stem(token)) for token, _ in tagged]
-        
-        processed_sentences.append({
-            'original': sentence,
-            'tokens': tokens,
-            'pos_tags': tagged,
-            'stems': stems
-        })
-    
-    return {
-        'sentences': processed_sentences,
-        'num_sentences': len(sentences),
-        'num_tokens': sum(len(s['tokens']) for s in processed_sentences)
-    }
+    return _default_pipeline(normalize, remove_stops).process(text)
@@ -0,0 +1,239 @@
+"""
+Nearest-document search indexes: BM25 over an inverted index and dense vectors.
+"""
+
+from typing import Any, Dict, Iterable, List, MutableMapping, Optional, Tuple
+from collections import Counter
+import math
+
+import numpy as np
+
+from .storage import TermIndex, term_arrays
+
+
+def _top_k(scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """Indices and values of the k highest positive scores, best first."""
+    if k <= 0 or not scores.size:
+        return []
+    if k < scores.size:
+        candidates = np.argpartition(scores, -k)[-k:]
+    else:
+        candidates = np.arange(scores.size)
+    candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return [(int(i), float(scores[i])) for i in candidates if scores[i] > 0]
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """Return array with room for at least size rows, doubling capacity."""
+    if size <= len(array):
+        return array
+    grown = np.zeros((max(size, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class BM25Index:
+    """
+    Incremental Okapi BM25 search over an inverted index.
+
+    Documents are token lists identified by their insertion order. Postings
+    are appended on add and merged into NumPy arrays lazily, per term, so a
+    query only touches the postings of its own terms. Postings of a loaded
+    index stay in (possibly memory-mapped) CSR arrays until a query needs them.
+
+    Args:
+        k1: Term frequency saturation
+        b: Document length normalisation
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_ids: MutableMapping[str, int] = {}
+        self._pending: Dict[int, Tuple[List[int], List[int]]] = {}  # term -> new (document ids, counts)
+        self._arrays: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}  # term -> merged postings
+        self._base = (np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+        self._lengths = np.zeros(0)
+        self.num_docs = 0
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def add(self, token_lists: Iterable[List[str]]) -> range:
+        """
+        Index tokenized documents.
+
+        Returns:
+            Range of ids assigned to the new documents
+        """
+        first = self.num_docs
+        for tokens in token_lists:
+            doc_id = self.num_docs
+            for term, count in Counter(tokens).items():
+                term_id = self.term_ids.setdefault(term, len(self.term_ids))
+                doc_ids, counts = self._pending.setdefault(term_id, ([], []))
+                doc_ids.append(doc_id)
+                counts.append(count)
+
+            self._lengths = _grow(self._lengths, doc_id + 1)
+            self._lengths[doc_id] = len(tokens)
+            self.total_length += len(tokens)
+            self.num_docs += 1
+        return range(first, self.num_docs)
+
+    def _posting_arrays(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(document ids, term counts) of a term as arrays."""
+        arrays = self._arrays.get(term_id)
+        if arrays is None:
+            indptr, doc_ids, counts = self._base
+            if term_id < len(indptr) - 1:
+                start, end = indptr[term_id], indptr[term_id + 1]
+                arrays = (doc_ids[start:end], counts[start:end])
+            else:
+                arrays = (np.zeros(0, dtype=np.int64), np.zeros(0))
+        
+        pending = self._pending.pop(term_id, None)
+        if pending is not None:
+            arrays = (
+                np.concatenate([arrays[0], np.asarray(pending[0], dtype=np.int64)]),
+                np.concatenate([arrays[1], np.asarray(pending[1], dtype=np.float64)])
+            )
+        self._arrays[term_id] = arrays
+        return arrays
+
+    def to_arrays(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        Export the index as metadata and flat arrays.
+        
+        Postings are stored in CSR layout: the postings of term i are
+        doc_ids[indptr[i]:indptr[i + 1]] with matching counts.
+        """
+        postings = [self._posting_arrays(term_id) for term_id in range(len(self.term_ids))]
+        indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        np.cumsum([len(doc_ids) for doc_ids, _ in postings], out=indptr[1:])
+        meta = {
+            'k1': self.k1,
+            'b': self.b,
+            'total_length': self.total_length
+        }
+        arrays = {
+            **term_arrays(self.term_ids, 'terms'),
+            'postings_indptr': indptr,
+            'postings_doc_ids': np.concatenate([doc_ids for doc_ids, _ in postings] or [np.zeros(0, dtype=np.int64)]),
+            'postings_counts': np.concatenate([counts for _, counts in postings] or [np.zeros(0)]),
+            'doc_lengths': self._lengths[:self.num_docs]
+        }
+        return meta, arrays
+
+    @classmethod
+    def from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'BM25Index':
+        """Rebuild an index exported by to_arrays without copying the arrays."""
+        index = cls(meta['k1'], meta['b'])
+        index.term_ids = TermIndex(arrays, 'terms')
+        index._base = (arrays['postings_indptr'], arrays['postings_doc_ids'], arrays['postings_counts'])
+        index._lengths = arrays['doc_lengths']
+        index.num_docs = len(index._lengths)
+        index.total_length = meta['total_length']
+        return index
+
+    def scores(self, tokens: List[str]) -> np.ndarray:
+        """BM25 score of every document for a tokenized query."""
+        scores = np.zeros(self.num_docs)
+        if not self.num_docs:
+            return scores
+
+        average_length = self.total_length / self.num_docs or 1.0
+        length_norm = self.k1 * (1 - self.b + self.b * self._lengths[:self.num_docs] / average_length)
+
+        for term, query_count in Counter(tokens).items():
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            doc_ids, counts = self._posting_arrays(term_id)
+            df = len(doc_ids)
+            idf = math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            # Postings hold each document at most once, so fancy-index += is safe
+            scores[doc_ids] += query_count * idf * counts * (self.k1 + 1) / (counts + length_norm[doc_ids])
+        return scores
+
+    def search(self, tokens: List[str], k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Find the best matching documents for a tokenized query.
+
+        Returns:
+            Up to k (document id, score) tuples, best first
+        """
+        return _top_k(self.scores(tokens), k)
+
+
+class VectorIndex:
+    """
+    Exact cosine-similarity search over dense vectors.
+
+    Vectors are L2-normalised on add and kept in one contiguous array, so a
+    query is a single matrix-vector product.
+    """
+
+    def __init__(self, dimension: Optional[int] = None):
+        self.dimension = dimension
+        self._vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The stored unit vectors, one row per document."""
+        return self._vectors[:self.size]
+
+    def add(self, vectors: np.ndarray) -> range:
+        """
+        Index a (num_docs x dimension) array of vectors.
+
+        Returns:
+            Range of ids assigned to the new vectors
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+            self._vectors = np.zeros((0, self.dimension), dtype=np.float32)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}, got {vectors.shape[1]}")
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+        first = self.size
+        self._vectors = _grow(self._vectors, self.size + len(vectors))
+        self._vectors[first:first + len(vectors)] = vectors
+        self.size += len(vectors)
+        return range(first, self.size)
+
+    def to_arrays(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """Export the index as metadata and arrays."""
+        return {'dimension': self.dimension}, {'vectors': self.vectors}
+
+    @classmethod
+    def from_arrays(cls, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> 'VectorIndex':
+        """Rebuild an index exported by to_arrays without copying the arrays."""
+        index = cls(meta['dimension'])
+        index._vectors = arrays['vectors']
+        index.size = len(index._vectors)
+        return index
+
+    def search(self, vector: np.ndarray, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Find the stored vectors most similar to a query vector.
+
+        Returns:
+            Up to k (document id, cosine similarity) tuples, best first
+        """
+        if not self.size:
+            return []
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return []
+        return _top_k(self.vectors @ (vector / norm), k)
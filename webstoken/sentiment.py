@@ -2,9 +2,11 @@
 Sentiment analysis module for determining text sentiment and emotion.
 """
 
-from typing import Dict, List, Set, Tuple
+from typing import Deque, Dict, Iterable, Iterator, List, Set, Tuple, Union
+from collections import deque
 import re
 
+from .document import Document, as_document
 from .tokenizer import WordTokenizer
 from .normalizer import TextNormalizer
 
@@ -98,32 +100,22 @@ class SentimentAnalyzer:
         
         # Compile patterns
         self.word_pattern = re.compile(r'\b\w+\b')
+        
+        # word -> emotions it signals, so each token needs a single lookup
+        self.emotion_index: Dict[str, List[str]] = {}
+        for emotion, emotion_set in self.emotion_words.items():
+            for word in emotion_set:
+                self.emotion_index.setdefault(word, []).append(emotion)
     
-    def _get_window_around_word(self, words: List[str], index: int, window_size: int = 3) -> List[str]:
-        """Get a window of words around a given index."""
-        start = max(0, index - window_size)
-        end = min(len(words), index + window_size + 1)
-        return words[start:end]
+    def _document(self, text: Union[str, Document]) -> Document:
+        """Wrap text in a Document that uses this analyzer's components."""
+        return as_document(text, normalizer=self.normalizer, word_tokenizer=self.word_tokenizer)
     
-    def _is_negated(self, words: List[str], index: int) -> bool:
-        """Check if a word is negated by looking at surrounding context."""
-        window = self._get_window_around_word(words, index)
-        return any(word in self.negation_words for word in window[:index-window[0]])
+    def tracker(self, window_size: int = 3) -> 'SentimentTracker':
+        """Create a tracker that scores text incrementally."""
+        return SentimentTracker(self, window_size)
     
-    def _get_intensity_multiplier(self, words: List[str], index: int) -> float:
-        """Get intensity multiplier based on modifiers."""
-        window = self._get_window_around_word(words, index)
-        multiplier = 1.0
-        
-        for word in window[:index-window[0]]:
-            if word in self.intensifiers:
-                multiplier *= self.intensifiers[word]
-            elif word in self.diminishers:
-                multiplier *= self.diminishers[word]
-        
-        return multiplier
-    
-    def analyze_sentiment(self, text: str) -> Dict[str, float]:
+    def analyze_sentiment(self, text: Union[str, Document]) -> Dict[str, float]:
         """
         Analyze sentiment of text.
         
@@ -135,71 +127,130 @@ class SentimentAnalyzer:
                 'confidence': float (0 to 1)
             }
         """
-        # Normalize and tokenize text
-        text = self.normalizer.normalize(text)
-        words = self.word_tokenizer.tokenize(text)
-        
-        positive_score = 0
-        negative_score = 0
-        word_count = len(words)
-        
-        for i, word in enumerate(words):
-            word = word.lower()
-            multiplier = self._get_intensity_multiplier(words, i)
-            is_negated = self._is_negated(words, i)
-            
-            if word in self.positive_words:
-                score = 1.0 * multiplier
-                positive_score += -score if is_negated else score
-            elif word in self.negative_words:
-                score = 1.0 * multiplier
-                negative_score += -score if is_negated else score
+        return self.tracker().update(text)
+    
+    def analyze_emotions(self, text: Union[str, Document]) -> List[Tuple[str, float]]:
+        """
+        Analyze emotions in text.
         
-        # Calculate metrics
-        total_score = positive_score + negative_score
-        total_magnitude = abs(positive_score) + abs(negative_score)
+        Returns:
+            List of (emotion, score) tuples, sorted by score
+        """
+        tracker = self.tracker()
+        tracker.update(text)
+        return tracker.emotions()
+    
+    def analyze_sentiment_many(self, texts: Iterable[Union[str, Document]]) -> List[Dict[str, float]]:
+        """Analyze the sentiment of each text independently."""
+        return [self.analyze_sentiment(text) for text in texts]
+    
+    def analyze_emotions_many(self, texts: Iterable[Union[str, Document]]) -> List[List[Tuple[str, float]]]:
+        """Analyze the emotions of each text independently."""
+        return [self.analyze_emotions(text) for text in texts]
+    
+    def analyze_stream(self, texts: Iterable[Union[str, Document]]) -> Iterator[Dict[str, float]]:
+        """
+        Score a stream of texts, such as chat history, incrementally.
         
-        if word_count == 0:
-            return {'polarity': 0.0, 'subjectivity': 0.0, 'confidence': 0.0}
+        Yields:
+            Cumulative sentiment of everything seen so far after each text
+        """
+        tracker = self.tracker()
+        for text in texts:
+            yield tracker.update(text)
+
+
+class SentimentTracker:
+    """
+    Single-pass sentiment and emotion scorer with rolling modifier state.
+    
+    Negation and intensity come from the preceding window_size tokens and
+    carry over between update() calls, so feeding a text in pieces gives the
+    same result as scoring it at once.
+    """
+    
+    def __init__(self, analyzer: SentimentAnalyzer, window_size: int = 3):
+        self.analyzer = analyzer
+        self.window_size = window_size
+        self.positive_score = 0.0
+        self.negative_score = 0.0
+        self.word_count = 0
+        self.emotion_scores: Dict[str, float] = {emotion: 0.0 for emotion in analyzer.emotion_words}
         
-        polarity = total_score / (word_count or 1)  # Normalize to [-1, 1]
-        subjectivity = total_magnitude / (word_count or 1)  # Normalize to [0, 1]
-        confidence = min(1.0, total_magnitude / (word_count / 2))  # Confidence based on magnitude
+        # (multiplier, is_negation) of the last window_size tokens
+        self._window: Deque[Tuple[float, bool]] = deque()
+        self._negations = 0
+    
+    def _push(self, word: str) -> float:
+        """Return the signed multiplier for word, then slide the window past it."""
+        analyzer = self.analyzer
+        multiplier = 1.0
+        for modifier, _ in self._window:
+            multiplier *= modifier
+        if self._negations:
+            multiplier = -multiplier
         
-        return {
-            'polarity': max(-1.0, min(1.0, polarity)),
-            'subjectivity': min(1.0, subjectivity),
-            'confidence': confidence
-        }
+        # Modifiers affect the words after them
+        modifier = analyzer.intensifiers.get(word) or analyzer.diminishers.get(word) or 1.0
+        is_negation = word in analyzer.negation_words
+        self._window.append((modifier, is_negation))
+        self._negations += is_negation
+        if len(self._window) > self.window_size:
+            _, dropped_negation = self._window.popleft()
+            self._negations -= dropped_negation
+        
+        return multiplier
     
-    def analyze_emotions(self, text: str) -> List[Tuple[str, float]]:
+    def update(self, text: Union[str, Document]) -> Dict[str, float]:
         """
-        Analyze emotions in text.
+        Add text to the running scores.
         
         Returns:
-            List of (emotion, score) tuples, sorted by score
+            Cumulative sentiment scores (see SentimentAnalyzer.analyze_sentiment)
         """
-        # Normalize and tokenize text
-        text = self.normalizer.normalize(text)
-        words = self.word_tokenizer.tokenize(text)
-        
-        emotion_scores = {emotion: 0.0 for emotion in self.emotion_words}
+        analyzer = self.analyzer
+        words = analyzer._document(text).lower_tokens
+        self.word_count += len(words)
         
-        for i, word in enumerate(words):
-            word = word.lower()
-            multiplier = self._get_intensity_multiplier(words, i)
-            is_negated = self._is_negated(words, i)
+        for word in words:
+            score = self._push(word)
+            
+            if word in analyzer.positive_words:
+                self.positive_score += score
+            elif word in analyzer.negative_words:
+                self.negative_score += score
             
-            for emotion, emotion_set in self.emotion_words.items():
-                if word in emotion_set:
-                    score = 1.0 * multiplier
-                    emotion_scores[emotion] += -score if is_negated else score
+            for emotion in analyzer.emotion_index.get(word, ()):
+                self.emotion_scores[emotion] += score
         
+        return self.sentiment()
+    
+    def sentiment(self) -> Dict[str, float]:
+        """Sentiment scores of everything seen so far."""
+        if self.word_count == 0:
+            return {'polarity': 0.0, 'subjectivity': 0.0, 'confidence': 0.0}
+        
+        # Calculate metrics
+        total_score = self.positive_score - self.negative_score
+        total_magnitude = abs(self.positive_score) + abs(self.negative_score)
+        
+        polarity = total_score / self.word_count  # Normalize to [-1, 1]
+        subjectivity = total_magnitude / self.word_count  # Normalize to [0, 1]
+        confidence = min(1.0, total_magnitude / (self.word_count / 2))  # Confidence based on magnitude
+        
+        return {
+            'polarity': max(-1.0, min(1.0, polarity)),
+            'subjectivity': min(1.0, subjectivity),
+            'confidence': confidence
+        }
+    
+    def emotions(self) -> List[Tuple[str, float]]:
+        """Emotion scores of everything seen so far, sorted by score."""
         # Normalize scores
-        max_score = max(abs(score) for score in emotion_scores.values()) or 1
+        max_score = max((abs(score) for score in self.emotion_scores.values()), default=0) or 1
         normalized_scores = [
             (emotion, score/max_score)
-            for emotion, score in emotion_scores.items()
+            for emotion, score in self.emotion_scores.items()
         ]
         
         # Sort by score
@@ -2,7 +2,9 @@
 Word stemming utilities.
 """
 
-from typing import Set
+from typing import Dict, List, Set
+from collections import OrderedDict
+import json
 
 
 class Stemmer:
@@ -71,3 +73,65 @@ class Stemmer:
             word = word[:-1]
             
         return word
+
+    def stem_many(self, words: List[str]) -> List[str]:
+        """Stem a list of words, stemming each distinct word only once."""
+        stems = {word: self.stem(word) for word in dict.fromkeys(words)}
+        return [stems[word] for word in words]
+
+
+class CachedStemmer(Stemmer):
+    """Stemmer with a bounded LRU cache of previously stemmed words."""
+    
+    def __init__(self, max_size: int = 100000):
+        super().__init__()
+        self.max_size = max_size
+        self._cache: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+    def stem(self, word: str) -> str:
+        """Return the cached stem of word, computing it on a miss."""
+        cache = self._cache
+        try:
+            result = cache[word]
+        except KeyError:
+            self.misses += 1
+            result = cache[word] = super().stem(word)
+            if len(cache) > self.max_size:
+                cache.popitem(last=False)
+            return result
+        
+        self.hits += 1
+        cache.move_to_end(word)
+        return result
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Return cache hit/miss statistics."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._cache),
+            'max_size': self.max_size
+        }
+    
+    def clear_cache(self) -> None:
+        """Empty the cache and reset statistics."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def save_cache(self, path: str) -> None:
+        """Persist cached stems to a JSON file, least recently used first."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(list(self._cache.items()), f, ensure_ascii=False)
+    
+    def load_cache(self, path: str) -> None:
+        """Warm the cache from a file written by save_cache."""
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        for word, stem in entries[-self.max_size:]:
+            self._cache[word] = stem
+            self._cache.move_to_end(word)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,204 @@
+"""
+On-disk model format: a directory of .npy arrays plus a JSON metadata file.
+
+Arrays are written with np.save and opened with np.load(mmap_mode='r'), so
+loading only maps the files and processes loading the same model share the
+pages read-only through the OS page cache. Strings (vocabularies, documents)
+are stored as UTF-8 bytes plus offsets, so they are mapped as well instead of
+being parsed from the metadata file.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Mapping, Tuple
+import collections.abc
+import hashlib
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 2
+META_FILE = 'meta.json'
+
+
+def write_model(path: str, kind: str, meta: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Write a model directory.
+
+    Args:
+        path: Target directory, created if missing
+        kind: Model type name, checked again on load
+        meta: JSON-serialisable metadata
+        arrays: Named arrays, each stored as <name>.npy
+    """
+    os.makedirs(path, exist_ok=True)
+    for name, array in arrays.items():
+        _replace(os.path.join(path, f"{name}.npy"),
+                 lambda f: np.save(f, np.ascontiguousarray(array), allow_pickle=False), 'wb')
+
+    # Metadata goes last so a directory with a meta file is always complete
+    header = {'format': FORMAT_VERSION, 'kind': kind, 'arrays': sorted(arrays), 'meta': meta}
+    _replace(os.path.join(path, META_FILE), lambda f: json.dump(header, f, ensure_ascii=False), 'w')
+
+
+def _replace(path: str, write, mode: str) -> None:
+    """
+    Write a file through a temporary file and rename it into place.
+
+    Processes that still map the old file keep reading the old contents
+    instead of seeing it truncated.
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+        write(f)
+    os.replace(temp_path, path)
+
+
+def read_model(path: str, kind: str, mmap: bool = True) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Read a model directory written by write_model.
+
+    Args:
+        path: Model directory
+        kind: Expected model type name
+        mmap: Memory-map arrays read-only instead of reading them into memory
+
+    Returns:
+        (meta, arrays)
+    """
+    with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+        header = json.load(f)
+
+    if header.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported model format {header.get('format')} in {path}")
+    if header.get('kind') != kind:
+        raise ValueError(f"{path} contains a {header.get('kind')} model, not {kind}")
+
+    arrays = {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r' if mmap else None,
+                      allow_pickle=False)
+        for name in header['arrays']
+    }
+    return header['meta'], arrays
+
+
+def string_arrays(strings: Iterable[str], name: str) -> Dict[str, np.ndarray]:
+    """
+    Encode strings as arrays for write_model.
+
+    Returns:
+        <name>_offsets (int64, one more than the number of strings) and
+        <name>_data (the concatenated UTF-8 bytes)
+    """
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return {f"{name}_offsets": offsets, f"{name}_data": np.frombuffer(b''.join(encoded), dtype=np.uint8)}
+
+
+class StringArray(collections.abc.Sequence):
+    """
+    Read-only sequence of strings stored by string_arrays.
+
+    Strings are decoded on access, so a memory-mapped array costs nothing
+    until it is read.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], name: str):
+        self._offsets = arrays[f"{name}_offsets"]
+        self._data = arrays[f"{name}_data"]
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(len(self))[index]]
+        index = range(len(self))[index]
+        return self._data[self._offsets[index]:self._offsets[index + 1]].tobytes().decode('utf-8')
+
+
+def _term_hash(term: str) -> int:
+    """Stable 64-bit hash of a term (the built-in hash differs between processes)."""
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def term_arrays(terms: Mapping[str, int], name: str) -> Dict[str, np.ndarray]:
+    """
+    Encode a term -> id map as arrays for write_model, read back by TermIndex.
+
+    Terms are ordered by hash, with <name>_hashes and <name>_ids alongside
+    the string arrays.
+    """
+    items = list(terms.items())
+    hashes = np.fromiter((_term_hash(term) for term, _ in items), dtype=np.uint64, count=len(items))
+    order = np.argsort(hashes, kind='stable')
+    arrays = string_arrays((items[i][0] for i in order), name)
+    arrays[f"{name}_hashes"] = hashes[order]
+    arrays[f"{name}_ids"] = np.fromiter((term_id for _, term_id in items), dtype=np.int64,
+                                        count=len(items))[order]
+    return arrays
+
+
+class TermIndex(collections.abc.MutableMapping):
+    """
+    Term -> id map over arrays written by term_arrays.
+
+    A lookup is a binary search over the (memory-mapped) hashes and one
+    string comparison, so loading decodes nothing however large the
+    vocabulary is. Terms set after loading are kept in an ordinary dict;
+    stored terms cannot be deleted.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], name: str):
+        self._hashes = arrays[f"{name}_hashes"]
+        self._ids = arrays[f"{name}_ids"]
+        self._terms = StringArray(arrays, name)
+        self._added: Dict[str, int] = {}
+        self._new = 0  # added terms that are not stored
+
+    def _find(self, term: str) -> int:
+        """Position of a stored term, or -1."""
+        term_hash = np.uint64(_term_hash(term))
+        position = int(np.searchsorted(self._hashes, term_hash))
+        while position < len(self._hashes) and self._hashes[position] == term_hash:
+            if self._terms[position] == term:
+                return position
+            position += 1
+        return -1
+
+    def get(self, term: str, default=None):
+        """Id of a term, or default when it is unknown."""
+        term_id = self._added.get(term)
+        if term_id is not None:
+            return term_id
+        position = self._find(term)
+        return default if position < 0 else int(self._ids[position])
+
+    def __getitem__(self, term: str) -> int:
+        term_id = self.get(term)
+        if term_id is None:
+            raise KeyError(term)
+        return term_id
+
+    def __contains__(self, term: object) -> bool:
+        return isinstance(term, str) and self.get(term) is not None
+
+    def __setitem__(self, term: str, term_id: int) -> None:
+        if term not in self._added and self._find(term) < 0:
+            self._new += 1
+        self._added[term] = term_id
+
+    def __delitem__(self, term: str) -> None:
+        if self._find(term) >= 0:
+            raise TypeError(f"Stored term '{term}' cannot be deleted")
+        del self._added[term]
+        self._new -= 1
+
+    def __len__(self) -> int:
+        return len(self._hashes) + self._new
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._added
+        for term in self._terms:
+            if term not in self._added:
+                yield term
@@ -2,13 +2,13 @@
 Part-of-Speech tagging utilities.
 """
 
-from typing import List, Set, Tuple
+from typing import Dict, List, Set, Tuple
 
 
 class POSTagger:
     """Simple rule-based Part-of-Speech tagger."""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 100000):
         # Basic rules for POS tagging
         self.noun_suffixes: Set[str] = {'ness', 'ment', 'ship', 'dom', 'hood', 'er', 'or', 'ist'}
         self.verb_suffixes: Set[str] = {'ize', 'ate', 'ify', 'ing', 'ed'}
@@ -20,41 +20,70 @@ class POSTagger:
         self.prepositions: Set[str] = {'in', 'on', 'at', 'by', 'with', 'from', 'to', 'for'}
         self.pronouns: Set[str] = {'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her'}
         
+        # Tags of already seen words
+        self.cache_size = cache_size
+        self._cache: Dict[str, str] = {}
+        self.compile_rules()
+    
+    def compile_rules(self) -> None:
+        """
+        Compile word lists and suffix sets into lookup tables.
+        
+        Call this again after modifying any of the rule sets.
+        """
+        self._word_tags: Dict[str, str] = {}
+        for tag, words in (('PRON', self.pronouns), ('PREP', self.prepositions), ('DET', self.determiners)):
+            for word in words:
+                self._word_tags[word] = tag
+        
+        # suffix -> (priority, tag); earlier categories win when several suffixes match
+        self._suffix_tags: Dict[str, Tuple[int, str]] = {}
+        categories = (self.noun_suffixes, self.verb_suffixes, self.adj_suffixes, self.adv_suffixes)
+        for priority, (tag, suffixes) in reversed(list(enumerate(zip(('NOUN', 'VERB', 'ADJ', 'ADV'), categories)))):
+            for suffix in suffixes:
+                self._suffix_tags[suffix] = (priority, tag)
+        self._suffix_lengths = sorted({len(suffix) for suffix in self._suffix_tags}, reverse=True)
+        self._cache.clear()
+    
+    def _tag_word(self, word: str) -> str:
+        """Return the tag of a lowercased word."""
+        tag = self._word_tags.get(word)
+        if tag is not None:
+            return tag
+        
+        # Check suffixes with one dict lookup per suffix length
+        best = None
+        for length in self._suffix_lengths:
+            match = self._suffix_tags.get(word[-length:]) if len(word) >= length else None
+            if match is not None and (best is None or match[0] < best[0]):
+                best = match
+        if best is not None:
+            return best[1]
+        
+        # Default cases
+        if word.isdigit():
+            return 'NUM'
+        if not word.isalnum():
+            return 'PUNCT'
+        return 'NOUN'  # Default to noun
+    
+    def _lookup(self, word: str) -> str:
+        """Cached _tag_word."""
+        tag = self._cache.get(word)
+        if tag is None:
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            tag = self._cache[word] = self._tag_word(word)
+        return tag
+        
     def tag(self, tokens: List[str]) -> List[Tuple[str, str]]:
         """Assign POS tags to tokens based on rules."""
-        tagged = []
-        prev_tag = None
-        
-        for i, token in enumerate(tokens):
-            word = token.lower()
-            
-            # Check special cases first
-            if word in self.determiners:
-                tag = 'DET'
-            elif word in self.prepositions:
-                tag = 'PREP'
-            elif word in self.pronouns:
-                tag = 'PRON'
-            # Check suffixes
-            elif any(word.endswith(suffix) for suffix in self.noun_suffixes):
-                tag = 'NOUN'
-            elif any(word.endswith(suffix) for suffix in self.verb_suffixes):
-                tag = 'VERB'
-            elif any(word.endswith(suffix) for suffix in self.adj_suffixes):
-                tag = 'ADJ'
-            elif any(word.endswith(suffix) for suffix in self.adv_suffixes):
-                tag = 'ADV'
-            # Default cases
-            elif word[0].isupper() and i > 0:
-                tag = 'PROPN'  # Proper noun
-            elif word.isdigit():
-                tag = 'NUM'
-            elif not word.isalnum():
-                tag = 'PUNCT'
-            else:
-                tag = 'NOUN'  # Default to noun
-            
-            tagged.append((token, tag))
-            prev_tag = tag
-            
-        return tagged
+        return [(token, self._lookup(token.lower())) for token in tokens]
+    
+    def tag_many(self, token_lists: List[List[str]]) -> List[List[Tuple[str, str]]]:
+        """Tag several token lists, resolving each distinct word only once."""
+        tags = {
+            word: self._lookup(word)
+            for word in {token.lower() for tokens in token_lists for token in tokens}
+        }
+        return [[(token, tags[token.lower()]) for token in tokens] for tokens in token_lists]
@@ -2,7 +2,7 @@
 Tokenization utilities for sentence and word-level tokenization.
 """
 
-from typing import List, Dict, Set, Pattern
+from typing import Iterable, Iterator, List, Dict, Set, Pattern
 import re
 
 
@@ -99,6 +99,12 @@ class SentenceTokenizer:
             re.VERBOSE
         )
 
+        # Trailing run of characters that a boundary match (or its lookahead) can
+        # still extend into when more text arrives
+        self.OPEN_TAIL: Pattern = re.compile(
+            r'[.!?…。！？」』】"\'()\[\]{}«»‹›「『《〈\s]*\Z'
+        )
+
         # Pattern for abbreviations
         abbrev_pattern = '|'.join(re.escape(abbr) for abbr in self.all_abbreviations)
         self.ABBREV_PATTERN: Pattern = re.compile(
@@ -123,6 +129,45 @@ class SentenceTokenizer:
                 
         return final_sentences
 
+    def iter_sentences(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Incrementally split a stream of text chunks into sentences.
+
+        Only the unfinished tail of the text is kept between chunks, and each
+        sentence is yielded as soon as its boundary is confirmed. The result is
+        the same as tokenize() on the concatenated chunks.
+        """
+        buffer = ''
+        piece_start = 0  # start of the current, unconfirmed sentence
+        scan_from = 0    # no boundary can start before this position
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buffer += chunk
+
+            # Boundaries found here are final: each match and its lookahead lie
+            # entirely inside text that will not change
+            for match in self.SENTENCE_END.finditer(buffer, scan_from):
+                sentence = buffer[piece_start:match.start()].strip()
+                if sentence:
+                    yield sentence
+                piece_start = match.end()
+
+            # Drop confirmed text, keeping one character for the lookbehinds
+            keep = max(0, piece_start - 1)
+            buffer = buffer[keep:]
+            piece_start -= keep
+
+            # A new boundary can only appear in the trailing run of punctuation,
+            # quotes and whitespace (plus the character before it)
+            tail_start = self.OPEN_TAIL.search(buffer, piece_start).start()
+            scan_from = max(piece_start, tail_start - 1)
+
+        sentence = buffer[piece_start:].strip()
+        if sentence:
+            yield sentence
+
 
 class WordTokenizer:
     """Simple but effective word tokenizer with support for contractions and special cases."""
@@ -156,3 +201,8 @@ class WordTokenizer:
             else:
                 tokens.append(word)
         return tokens
+
+    def iter_tokenize(self, sentences: Iterable[str]) -> Iterator[List[str]]:
+        """Tokenize a stream of sentences, yielding one token list per sentence."""
+        for sentence in sentences:
+            yield self.tokenize(sentence)
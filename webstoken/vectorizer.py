@@ -0,0 +1,126 @@
+"""
+Sparse TF-IDF vectorization backed by NumPy arrays.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Tuple
+from collections import Counter
+import math
+
+import numpy as np
+
+
+class CSRMatrix:
+    """Minimal compressed sparse row matrix backed by NumPy arrays."""
+
+    def __init__(self, data: np.ndarray, indices: np.ndarray, indptr: np.ndarray,
+                 shape: Tuple[int, int]):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = shape
+        self._row_ids = None
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[int, float]], num_cols: int) -> 'CSRMatrix':
+        """Build a matrix from a list of {column: value} rows."""
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indices: List[int] = []
+        data: List[float] = []
+
+        for i, row in enumerate(rows):
+            for col in sorted(row):
+                indices.append(col)
+                data.append(row[col])
+            indptr[i + 1] = len(indices)
+
+        return cls(
+            np.asarray(data, dtype=np.float64),
+            np.asarray(indices, dtype=np.int64),
+            indptr,
+            (len(rows), num_cols)
+        )
+
+    @classmethod
+    def from_coo(cls, rows: np.ndarray, cols: np.ndarray, values: np.ndarray,
+                 shape: Tuple[int, int]) -> 'CSRMatrix':
+        """Build a matrix from coordinate triplets, summing duplicate entries."""
+        keys, inverse = np.unique(rows * shape[1] + cols, return_inverse=True)
+        data = np.bincount(inverse, weights=values, minlength=len(keys))
+        row_of_key = keys // shape[1]
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_of_key, minlength=shape[0]), out=indptr[1:])
+        return cls(data.astype(np.float64), (keys % shape[1]).astype(np.int64), indptr, shape)
+
+    def row_ids(self) -> np.ndarray:
+        """Row index of every stored value."""
+        if self._row_ids is None:
+            self._row_ids = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        return self._row_ids
+
+    def row(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (indices, values) of row i."""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.data[start:end]
+
+    def row_norms(self) -> np.ndarray:
+        """L2 norm of every row."""
+        sums = np.zeros(self.shape[0])
+        np.add.at(sums, self.row_ids(), self.data * self.data)
+        return np.sqrt(sums)
+
+    def row_sums(self) -> np.ndarray:
+        """Sum of every row."""
+        return np.bincount(self.row_ids(), weights=self.data,
+                           minlength=self.shape[0]).astype(np.float64)
+
+    def matvec(self, vector: np.ndarray) -> np.ndarray:
+        """Multiply by a dense vector of length num_cols."""
+        return np.bincount(self.row_ids(), weights=self.data * vector[self.indices],
+                           minlength=self.shape[0]).astype(np.float64)
+
+    def dot(self, dense: np.ndarray) -> np.ndarray:
+        """Multiply by a dense (num_cols x k) matrix, returning (num_rows x k)."""
+        out = np.zeros((self.shape[0], dense.shape[1]))
+        if self.data.size:
+            np.add.at(out, self.row_ids(), self.data[:, None] * dense[self.indices])
+        return out
+
+
+class TfidfVectorizer:
+    """TF-IDF vectorizer with a term->index vocabulary and sparse output."""
+
+    def __init__(self):
+        self.vocabulary: Mapping[str, int] = {}
+        self.idf: np.ndarray = np.zeros(0)
+
+    def fit(self, token_lists: Iterable[List[str]]) -> 'TfidfVectorizer':
+        """Build vocabulary and IDF weights from tokenized documents."""
+        doc_frequencies: Counter = Counter()
+        total_docs = 0
+        for tokens in token_lists:
+            doc_frequencies.update(set(tokens))
+            total_docs += 1
+
+        terms = sorted(doc_frequencies)
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.idf = np.array(
+            [math.log(total_docs / (doc_frequencies[term] + 1)) for term in terms],
+            dtype=np.float64
+        )
+        return self
+
+    def transform(self, token_lists: Iterable[List[str]]) -> CSRMatrix:
+        """Convert tokenized documents into a sparse TF-IDF matrix."""
+        rows = []
+        for tokens in token_lists:
+            row: Dict[int, float] = {}
+            for word, tf in Counter(tokens).items():
+                index = self.vocabulary.get(word)
+                if index is not None:
+                    row[index] = tf * self.idf[index]
+            rows.append(row)
+        return CSRMatrix.from_rows(rows, len(self.vocabulary))
+
+    def fit_transform(self, token_lists: List[List[str]]) -> CSRMatrix:
+        """Fit on documents and return their TF-IDF matrix."""
+        return self.fit(token_lists).transform(token_lists)